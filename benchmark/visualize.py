@@ -8,6 +8,10 @@ import sys
 from pathlib import Path
 from typing import Dict, List
 
+# Widest bar in the ASCII chart; bars are slices of this one string
+CHART_WIDTH = 50
+_FULL_BAR = "█" * CHART_WIDTH
+
 
 def load_summary(summary_file: str) -> Dict:
     """Load benchmark summary"""
@@ -110,14 +114,16 @@ def generate_ascii_chart(mcp_time: float, manual_time: float):
     print("="*80)
 
     max_time = max(mcp_time, manual_time)
-    scale = 50 / max_time  # Scale to 50 chars max
+    scale = CHART_WIDTH / max_time  # Scale to 50 chars max
 
-    mcp_bar = "█" * int(mcp_time * scale)
-    manual_bar = "█" * int(manual_time * scale)
+    mcp_bar = _FULL_BAR[:int(mcp_time * scale)]
+    manual_bar = _FULL_BAR[:int(manual_time * scale)]
 
-    print(f"\nMCP     │{mcp_bar} {mcp_time:.2f}s")
-    print(f"Manual  │{manual_bar} {manual_time:.2f}s")
-    print(f"\nSpeedup: {manual_time / mcp_time:.1f}x faster with MCP")
+    print(
+        f"\nMCP     │{mcp_bar} {mcp_time:.2f}s\n"
+        f"Manual  │{manual_bar} {manual_time:.2f}s\n"
+        f"\nSpeedup: {manual_time / mcp_time:.1f}x faster with MCP"
+    )
 
 
 def main():
@@ -4,11 +4,36 @@ Complete toolkit for measuring RAG system performance
 """
 
 import json
+import shelve
+import threading
 import time
-from typing import List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 from collections import defaultdict
 
+import numpy as np
+
+# Numba JIT for the per-query metric kernel (optional - plain Python otherwise)
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+# Anthropic SDK is only needed for the end-to-end Claude comparison
+try:
+    import anthropic
+except ImportError:
+    anthropic = None
+
 # ============================================================================
 # 1. TEST DATA STRUCTURES
 # ============================================================================
@@ -87,8 +112,193 @@ def create_test_dataset() -> List[TestQuery]:
 # 3. METRIC CALCULATORS
 # ============================================================================
 
+@lru_cache(maxsize=None)
+def _discounts(n: int) -> np.ndarray:
+    """Positional discounts 1/log2(rank + 1) for ranks 1..n"""
+    discounts = 1.0 / np.log2(np.arange(2, n + 2))
+    discounts.setflags(write=False)  # Shared across calls
+    return discounts
+
+
+@lru_cache(maxsize=None)
+def _idcg_binary(num_relevant: int, k: int) -> float:
+    """Ideal DCG for binary relevance - every relevant doc ranked first"""
+    return float(_discounts(min(num_relevant, k)).sum())
+
+
+@dataclass
+class QueryMetrics:
+    """
+    Retrieval metrics for a single query
+    Hashes the ground truth once so every K / metric reuses the same set
+    """
+    relevant: List[str]
+
+    def __post_init__(self):
+        self.relevant_set = frozenset(self.relevant)
+
+    def _hits(self, retrieved: List[str], k: int) -> int:
+        """Distinct relevant docs in the top K (no set built for top K)"""
+        return len(self.relevant_set.intersection(retrieved[:k]))
+
+    def recall_at_k(self, retrieved: List[str], k: int) -> float:
+        """Calculate Recall@K"""
+        if not self.relevant_set:
+            return 0.0
+
+        return self._hits(retrieved, k) / len(self.relevant_set)
+
+    def precision_at_k(self, retrieved: List[str], k: int) -> float:
+        """Calculate Precision@K"""
+        if k == 0:
+            return 0.0
+
+        return self._hits(retrieved, k) / k
+
+    def mean_reciprocal_rank(self, retrieved: List[str]) -> float:
+        """Calculate MRR - rank of first relevant result"""
+        for rank, doc in enumerate(retrieved, 1):
+            if doc in self.relevant_set:
+                return 1.0 / rank
+
+        return 0.0  # No relevant doc found
+
+    def ndcg_at_k(self, retrieved: List[str], k: int) -> float:
+        """
+        Normalized Discounted Cumulative Gain
+        Accounts for position - higher relevance at top = better
+        """
+        # Binary relevance: 1 for the first hit on each relevant doc, so a
+        # doc retrieved twice (e.g. two chunks of one file) counts once
+        seen = set()
+        relevances = np.zeros(min(k, len(retrieved)))
+        for i, doc in enumerate(retrieved[:k]):
+            if doc in self.relevant_set and doc not in seen:
+                seen.add(doc)
+                relevances[i] = 1.0
+
+        dcg_val = float(relevances @ _discounts(relevances.size))
+
+        # Ideal DCG (all relevant docs at top) depends only on |relevant| and K
+        idcg_val = _idcg_binary(len(self.relevant_set), k)
+
+        return dcg_val / idcg_val if idcg_val > 0 else 0.0
+
+
+@njit(cache=True)
+def _recall_precision_mrr_loop(retrieved_ids: np.ndarray,
+                         relevant_ids: np.ndarray,
+                         k_values: np.ndarray) -> np.ndarray:
+    """
+    All retrieval metrics for one query in a single pass over int IDs
+    
+    Args:
+        retrieved_ids: Retrieved doc IDs in rank order
+        relevant_ids: Distinct ground-truth doc IDs, sorted ascending
+        k_values: K values to score
+    
+    Returns:
+        [recall@k1, precision@k1, recall@k2, ..., mrr]
+        (same semantics as QueryMetrics)
+    """
+    n_k = k_values.shape[0]
+    n_retrieved = retrieved_ids.shape[0]
+    n_relevant = relevant_ids.shape[0]
+    out = np.zeros(2 * n_k + 1)
+    
+    # cum_hits[i] = distinct relevant docs in the top i+1 results
+    cum_hits = np.zeros(n_retrieved, dtype=np.int64)
+    counted = np.zeros(n_relevant, dtype=np.bool_)  # Only a doc's first occurrence counts
+    hits = 0
+    first_hit = -1
+    for i in range(n_retrieved):
+        doc = retrieved_ids[i]
+        
+        # Binary search the sorted ground truth - O(log n_relevant) per hit
+        # test, instead of a linear scan plus a rescan of earlier results
+        j = np.searchsorted(relevant_ids, doc)
+        if j < n_relevant and relevant_ids[j] == doc:
+            if first_hit < 0:
+                first_hit = i
+            if not counted[j]:
+                counted[j] = True
+                hits += 1
+        cum_hits[i] = hits
+    
+    for i in range(n_k):
+        k = k_values[i]
+        top_hits = 0
+        if k > 0 and n_retrieved > 0:
+            top_hits = cum_hits[min(k, n_retrieved) - 1]
+        
+        if n_relevant > 0:
+            out[2 * i] = top_hits / n_relevant
+        if k > 0:
+            out[2 * i + 1] = top_hits / k
+    
+    if first_hit >= 0:
+        out[2 * n_k] = 1.0 / (first_hit + 1)
+    
+    return out
+
+
+def _recall_precision_mrr_vectorized(retrieved_ids: np.ndarray,
+                                     relevant_ids: np.ndarray,
+                                     k_values: np.ndarray) -> np.ndarray:
+    """
+    NumPy version of the metric kernel - one hit mask, one cumsum
+    Same arguments and output layout as the JIT'd loop
+    """
+    n_k = k_values.shape[0]
+    n_retrieved = retrieved_ids.shape[0]
+    n_relevant = relevant_ids.shape[0]
+    out = np.zeros(2 * n_k + 1)
+    if n_retrieved == 0:
+        return out
+    
+    hits = np.isin(retrieved_ids, relevant_ids)
+    
+    # Only the first occurrence of a doc counts toward recall/precision
+    first_seen = np.zeros(n_retrieved, dtype=np.bool_)
+    first_seen[np.unique(retrieved_ids, return_index=True)[1]] = True
+    cum_hits = np.cumsum(hits & first_seen)
+    
+    top_hits = np.where(k_values > 0,
+                        cum_hits[np.clip(np.minimum(k_values, n_retrieved) - 1, 0, None)],
+                        0)
+    if n_relevant > 0:
+        out[0:2 * n_k:2] = top_hits / n_relevant
+    out[1:2 * n_k:2] = np.where(k_values > 0, top_hits / np.maximum(k_values, 1), 0.0)
+    
+    if hits.any():
+        out[2 * n_k] = 1.0 / (np.argmax(hits) + 1)
+    
+    return out
+
+
+# Compiled loop when Numba is available; without it the interpreted loop is
+# the slow path, so fall back to whole-array NumPy ops instead
+recall_precision_mrr = (_recall_precision_mrr_loop if HAS_NUMBA
+                        else _recall_precision_mrr_vectorized)
+
+
+def metric_keys(k_values: List[int]) -> List[Tuple[str, int]]:
+    """Metric keys in kernel output order: recall/precision per K, then MRR"""
+    return [(kind, k) for k in k_values for kind in ('recall', 'precision')] + [('mrr', 0)]
+
+
+def metric_name(key: Tuple[str, int]) -> str:
+    """Report name for a metric key, e.g. ('recall', 5) -> 'recall@5'"""
+    kind, k = key
+    return kind if kind == 'mrr' else f'{kind}@{k}'
+
+
 class RetrievalMetrics:
-    """Calculate retrieval performance metrics"""
+    """
+    Calculate retrieval performance metrics
+    One-off helpers - when scoring a query at several K, build a
+    QueryMetrics once and call it directly instead
+    """
     
     @staticmethod
     def recall_at_k(retrieved: List[str], 
@@ -105,32 +315,14 @@ class RetrievalMetrics:
         Returns:
             Recall score (0.0 to 1.0)
         """
-        if not relevant:
-            return 0.0
-            
-        top_k = set(retrieved[:k])
-        relevant_set = set(relevant)
-        
-        hits = len(top_k & relevant_set)
-        recall = hits / len(relevant_set)
-        
-        return recall
+        return QueryMetrics(relevant).recall_at_k(retrieved, k)
     
     @staticmethod
     def precision_at_k(retrieved: List[str], 
                        relevant: List[str], 
                        k: int) -> float:
         """Calculate Precision@K"""
-        if k == 0:
-            return 0.0
-            
-        top_k = set(retrieved[:k])
-        relevant_set = set(relevant)
-        
-        hits = len(top_k & relevant_set)
-        precision = hits / k
-        
-        return precision
+        return QueryMetrics(relevant).precision_at_k(retrieved, k)
     
     @staticmethod
     def mean_reciprocal_rank(retrieved: List[str], 
@@ -138,13 +330,7 @@ class RetrievalMetrics:
         """
         Calculate MRR - rank of first relevant result
         """
-        relevant_set = set(relevant)
-        
-        for rank, doc in enumerate(retrieved, 1):
-            if doc in relevant_set:
-                return 1.0 / rank
-        
-        return 0.0  # No relevant doc found
+        return QueryMetrics(relevant).mean_reciprocal_rank(retrieved)
     
     @staticmethod
     def ndcg_at_k(retrieved: List[str],
@@ -154,21 +340,7 @@ class RetrievalMetrics:
         Normalized Discounted Cumulative Gain
         Accounts for position - higher relevance at top = better
         """
-        def dcg(relevances: List[int], k: int) -> float:
-            return sum(rel / np.log2(i + 2) 
-                      for i, rel in enumerate(relevances[:k]))
-        
-        # Binary relevance: 1 if in relevant set, 0 otherwise
-        relevances = [1 if doc in relevant else 0 
-                     for doc in retrieved[:k]]
-        
-        # Ideal DCG (all relevant docs at top)
-        ideal_relevances = sorted(relevances, reverse=True)
-        
-        dcg_val = dcg(relevances, k)
-        idcg_val = dcg(ideal_relevances, k)
-        
-        return dcg_val / idcg_val if idcg_val > 0 else 0.0
+        return QueryMetrics(relevant).ndcg_at_k(retrieved, k)
 
 # ============================================================================
 # 4. RELEVANCE SCORING
@@ -232,11 +404,75 @@ class RelevanceScorer:
 # 5. END-TO-END EVALUATION
 # ============================================================================
 
+def cached_retrieval(retrieval_fn,
+                     persist_path: Optional[str] = None,
+                     maxsize: int = 1024):
+    """
+    Memoize a retrieval function by (query, k)
+    
+    Repeat queries (re-running the same test set while tuning) skip the
+    embedding + vector search entirely. With persist_path, results are
+    also kept in a shelve DB so later runs start warm.
+    
+    Latencies measured through this wrapper are HOT-cache numbers -
+    report them separately from cold (uncached) runs.
+    """
+    shelf = shelve.open(persist_path) if persist_path else None
+    shelf_lock = threading.Lock()
+    
+    @lru_cache(maxsize=maxsize)
+    def lookup(query: str, k: Optional[int]):
+        key = f"{k}:{query}"
+        if shelf is not None:
+            with shelf_lock:
+                if key in shelf:
+                    return shelf[key]
+        
+        result = retrieval_fn(query) if k is None else retrieval_fn(query, k=k)
+        
+        if shelf is not None:
+            with shelf_lock:
+                shelf[key] = result
+                shelf.sync()
+        return result
+    
+    def cached(query: str, k: Optional[int] = None):
+        return lookup(query, k)
+    
+    cached.cache_info = lookup.cache_info
+    return cached
+
+
+# One cached_retrieval wrapper per retrieval function, shared by every
+# evaluator run - a per-call wrapper would start empty each time
+_shared_caches: Dict = {}
+_shared_caches_lock = threading.Lock()
+
+
+def shared_cached_retrieval(retrieval_fn):
+    """cached_retrieval(retrieval_fn), reused across calls for the same function"""
+    with _shared_caches_lock:
+        if retrieval_fn not in _shared_caches:
+            _shared_caches[retrieval_fn] = cached_retrieval(retrieval_fn)
+        return _shared_caches[retrieval_fn]
+
+
 class EndToEndEvaluator:
     """Compare RAG vs Baseline with Claude"""
     
+    model = "claude-sonnet-4-20250514"
+    max_workers = 8  # Concurrent requests - keep within your rate limit
+    max_retries = 5
+    
     def __init__(self, anthropic_api_key: str):
+        if anthropic is None:
+            raise ImportError(
+                "anthropic not installed. Run: pip install anthropic"
+            )
+        
         self.api_key = anthropic_api_key
+        # One client (and HTTP connection pool) reused across all questions
+        self.client = anthropic.Anthropic(api_key=anthropic_api_key)
     
     def run_baseline_test(self, 
                          questions: List[str]) -> List[Dict]:
@@ -244,49 +480,62 @@ class EndToEndEvaluator:
         Test Claude WITHOUT RAG context
         Returns responses for manual rating
         """
-        results = []
-        
-        for q in questions:
-            response = self._call_claude(q, context=None)
-            results.append({
+        def ask(q: str) -> Dict:
+            return {
                 'question': q,
-                'response': response,
+                'response': self._call_claude_with_retry(q, context=None),
                 'has_context': False
-            })
+            }
         
-        return results
+        return self._map_questions(ask, questions)
     
     def run_rag_test(self,
                     questions: List[str],
-                    rag_retrieval_fn) -> List[Dict]:
+                    rag_retrieval_fn,
+                    use_cache: bool = True) -> List[Dict]:
         """
         Test Claude WITH RAG context
         
         Args:
             rag_retrieval_fn: Function that takes query, returns context string
+            use_cache: Memoize retrieval per query, shared across runs over
+                the same rag_retrieval_fn (False for cold-cache runs)
         """
-        results = []
+        if use_cache:
+            rag_retrieval_fn = shared_cached_retrieval(rag_retrieval_fn)
         
-        for q in questions:
+        def ask(q: str) -> Dict:
             # Get context from your RAG system
             context = rag_retrieval_fn(q)
-            response = self._call_claude(q, context=context)
-            
-            results.append({
+            return {
                 'question': q,
-                'response': response,
+                'response': self._call_claude_with_retry(q, context=context),
                 'context': context,
                 'has_context': True
-            })
+            }
         
-        return results
+        return self._map_questions(ask, questions)
+    
+    def _map_questions(self, ask, questions: List[str]) -> List[Dict]:
+        """Run questions concurrently (network-bound), results in input order"""
+        if not questions:
+            return []
+        
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(questions))) as executor:
+            return list(executor.map(ask, questions))
+    
+    def _call_claude_with_retry(self, question: str, context: str = None) -> str:
+        """Call Claude, backing off exponentially when rate limited"""
+        for attempt in range(self.max_retries):
+            try:
+                return self._call_claude(question, context=context)
+            except anthropic.RateLimitError:
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(2 ** attempt)
     
     def _call_claude(self, question: str, context: str = None) -> str:
         """Call Claude API"""
-        import anthropic
-        
-        client = anthropic.Anthropic(api_key=self.api_key)
-        
         if context:
             prompt = f"""Here is relevant code from the codebase:
 
@@ -298,8 +547,8 @@ Please answer based on the provided code."""
         else:
             prompt = question
         
-        message = client.messages.create(
-            model="claude-sonnet-4-20250514",
+        message = self.client.messages.create(
+            model=self.model,
             max_tokens=1000,
             messages=[{"role": "user", "content": prompt}]
         )
@@ -342,42 +591,87 @@ class PerformanceMetrics:
     @staticmethod
     def measure_retrieval_latency(retrieval_fn, 
                                   queries: List[str],
-                                  k: int = 5) -> Dict:
+                                  k: int = 5,
+                                  use_cache: bool = False) -> Dict:
         """
         Measure retrieval performance
         
+        Cold (uncached) by default. With use_cache=True the queries go
+        through the shared (query, k) cache, warmed by an untimed first
+        pass, so the numbers are hot-cache latencies.
+        
         Returns:
             {
                 'mean_latency_ms': float,
                 'p50_latency_ms': float,
                 'p95_latency_ms': float,
-                'p99_latency_ms': float
+                'p99_latency_ms': float,
+                'cache': 'hot' | 'cold'
             }
         """
+        if use_cache:
+            retrieval_fn = shared_cached_retrieval(retrieval_fn)
+            for query in queries:  # Warm-up - every timed call below is a hit
+                retrieval_fn(query, k=k)
+        
         latencies = []
         
         for query in queries:
-            start = time.time()
+            start = time.perf_counter_ns()  # monotonic, ns resolution
             _ = retrieval_fn(query, k=k)
-            latency = (time.time() - start) * 1000  # ms
-            latencies.append(latency)
+            latencies.append(time.perf_counter_ns() - start)
         
-        latencies.sort()
-        n = len(latencies)
+        latencies = np.asarray(latencies, dtype=np.float64) / 1e6  # ns -> ms
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
         
         return {
-            'mean_latency_ms': sum(latencies) / n,
-            'p50_latency_ms': latencies[int(n * 0.5)],
-            'p95_latency_ms': latencies[int(n * 0.95)],
-            'p99_latency_ms': latencies[int(n * 0.99)],
-            'min_latency_ms': latencies[0],
-            'max_latency_ms': latencies[-1]
+            'mean_latency_ms': float(latencies.mean()),
+            'p50_latency_ms': float(p50),
+            'p95_latency_ms': float(p95),
+            'p99_latency_ms': float(p99),
+            'min_latency_ms': float(latencies.min()),
+            'max_latency_ms': float(latencies.max()),
+            'cache': 'hot' if use_cache else 'cold'
         }
 
 # ============================================================================
 # 7. COMPLETE EVALUATION PIPELINE
 # ============================================================================
 
+class VectorStoreRAG:
+    """
+    RAG system adapter over src.vector_store.VectorStore
+
+    Gives RAGEvaluator the .retrieve / .retrieve_batch interface it
+    expects; retrieve_batch goes through VectorStore.search_batch, so a
+    whole test set is one embedding call and one Chroma query.
+    """
+
+    def __init__(self, vector_store, filter_metadata: Optional[Dict] = None):
+        self.vector_store = vector_store
+        self.filter_metadata = filter_metadata
+
+    @staticmethod
+    def _to_results(hits: List[Dict]) -> List[RetrievalResult]:
+        return [
+            RetrievalResult(
+                file_path=hit['metadata']['file'],
+                chunk_content=hit['content'],
+                score=1.0 - hit['distance'] if hit['distance'] is not None else 0.0,
+                metadata=hit['metadata']
+            )
+            for hit in hits
+        ]
+
+    def retrieve(self, query: str, k: int = 5) -> List[RetrievalResult]:
+        return self.retrieve_batch([query], k=k)[0]
+
+    def retrieve_batch(self, queries: List[str], k: int = 5) -> List[List[RetrievalResult]]:
+        batches = self.vector_store.search_batch(queries, n_results=k,
+                                                 filter_metadata=self.filter_metadata)
+        return [self._to_results(hits) for hits in batches]
+
+
 class RAGEvaluator:
     """
     Complete evaluation pipeline
@@ -387,6 +681,64 @@ class RAGEvaluator:
     def __init__(self, test_queries: List[TestQuery]):
         self.test_queries = test_queries
         self.results = defaultdict(list)
+        
+        # Everything derived from the ground truth is computed once here,
+        # not on every evaluate_retrieval call
+        self._queries = [q.query for q in test_queries]
+        
+        self._category_ids = {}  # category -> index, in first-seen order
+        self._categories = np.array(
+            [self._category_ids.setdefault(q.category, len(self._category_ids))
+             for q in test_queries], dtype=np.intp)
+        self._category_counts = np.bincount(self._categories, minlength=len(self._category_ids))
+        
+        # File paths -> int IDs so the metric kernel compares ints, not
+        # strings; retrieved paths are added as they're seen
+        self._file_ids = {}
+        self._relevant_ids = [
+            np.array(sorted({self._file_ids.setdefault(f, len(self._file_ids))
+                             for f in q.relevant_files}), dtype=np.int64)
+            for q in test_queries
+        ]
+    
+    def score_retrieval(self,
+                        rag_system,
+                        k_values: List[int] = [1, 3, 5, 10]) -> Tuple[List[Tuple[str, int]], np.ndarray]:
+        """
+        Per-query retrieval scores, without aggregation or string keys
+        
+        Args:
+            rag_system: Same as evaluate_retrieval
+            k_values: Different K values to test
+            
+        Returns:
+            (metric keys, scores) - keys are ('recall', k), ('precision', k)
+            for each K then ('mrr', 0); scores[metric, query] follows the
+            key and test_queries order
+        """
+        keys = metric_keys(k_values)
+        scores = np.zeros((len(keys), len(self._queries)))
+        if not self._queries:
+            return keys, scores
+        
+        # Get retrieval results for every query up front
+        queries = self._queries
+        if hasattr(rag_system, 'retrieve_batch'):
+            all_retrieved = rag_system.retrieve_batch(queries, k=max(k_values))
+        else:
+            all_retrieved = [rag_system.retrieve(q, k=max(k_values)) for q in queries]
+        
+        file_ids = self._file_ids
+        k_array = np.array(k_values, dtype=np.int64)
+        
+        for j, (relevant_ids, retrieved) in enumerate(zip(self._relevant_ids, all_retrieved)):
+            retrieved_ids = np.array([file_ids.setdefault(r.file_path, len(file_ids))
+                                      for r in retrieved], dtype=np.int64)
+            
+            # recall@K, precision@K for each K, then MRR - one call per query
+            scores[:, j] = recall_precision_mrr(retrieved_ids, relevant_ids, k_array)
+        
+        return keys, scores
     
     def evaluate_retrieval(self, 
                           rag_system,
@@ -395,50 +747,37 @@ class RAGEvaluator:
         Evaluate retrieval metrics across all queries
         
         Args:
-            rag_system: Your RAG system with .retrieve(query, k) method
+            rag_system: Your RAG system with .retrieve(query, k) method,
+                and optionally .retrieve_batch(queries, k) to embed and
+                search all queries in one round trip
             k_values: Different K values to test
             
         Returns:
             Aggregated metrics
         """
-        metrics = defaultdict(lambda: defaultdict(list))
+        if not self.test_queries:
+            return {}
         
-        for query in self.test_queries:
-            # Get retrieval results
-            retrieved = rag_system.retrieve(query.query, k=max(k_values))
-            retrieved_files = [r.file_path for r in retrieved]
-            
-            # Calculate metrics for each K
-            for k in k_values:
-                recall = RetrievalMetrics.recall_at_k(
-                    retrieved_files, query.relevant_files, k
-                )
-                precision = RetrievalMetrics.precision_at_k(
-                    retrieved_files, query.relevant_files, k
-                )
-                
-                metrics[f'recall@{k}'][query.category].append(recall)
-                metrics[f'precision@{k}'][query.category].append(precision)
-            
-            # MRR (independent of K)
-            mrr = RetrievalMetrics.mean_reciprocal_rank(
-                retrieved_files, query.relevant_files
-            )
-            metrics['mrr'][query.category].append(mrr)
-        
-        # Aggregate results
-        aggregated = {}
-        for metric_name, category_scores in metrics.items():
-            aggregated[metric_name] = {
-                'overall': sum(sum(scores) for scores in category_scores.values()) / 
-                          sum(len(scores) for scores in category_scores.values()),
+        keys, scores = self.score_retrieval(rag_system, k_values)
+        
+        # Aggregate results - whole-array reductions over scores[metric, query]
+        overall = scores.mean(axis=1)
+        
+        category_sums = np.zeros((len(self._category_ids), len(keys)))
+        np.add.at(category_sums, self._categories, scores.T)
+        by_category = category_sums / self._category_counts[:, None]
+        
+        # Metric names only get built here, for the output
+        return {
+            metric_name(key): {
+                'overall': float(overall[m]),
                 'by_category': {
-                    cat: sum(scores) / len(scores)
-                    for cat, scores in category_scores.items()
+                    cat: float(by_category[c, m])
+                    for cat, c in self._category_ids.items()
                 }
             }
-        
-        return aggregated
+            for m, key in enumerate(keys)
+        }
     
     def generate_report(self, metrics: Dict) -> str:
         """Generate markdown report"""
@@ -480,8 +819,9 @@ def main():
     # 3. Evaluate your RAG system
     print("\nStep 2: Evaluating retrieval...")
     # Your RAG system should implement .retrieve(query, k) method
-    # from your_rag_system import MyRAG
-    # rag = MyRAG()
+    # (and .retrieve_batch(queries, k) to search all queries at once), e.g.
+    # from src.vector_store import VectorStore
+    # rag = VectorStoreRAG(VectorStore())
     # metrics = evaluator.evaluate_retrieval(rag)
     
     # 4. Generate report
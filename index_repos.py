@@ -4,21 +4,29 @@ Main indexing script - indexes repos, generates embeddings, stores in Chroma.
 Run this to build/update the vector database.
 """
 
+import logging
 import os
 import sys
+from itertools import islice
 from dotenv import load_dotenv
 
 from src.indexer import CodeIndexer
-from src.embeddings import EmbeddingGenerator
 from src.vector_store import VectorStore
 
+# Functions embedded + stored per round
+STREAM_BATCH = 1000
+
 
 def main():
     # Load environment (override any existing vars)
     load_dotenv(override=True)
 
+    # Show the vector store / embedding progress messages
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
     repos_path = os.getenv("REPOS_PATH", "./repos")
     chroma_path = os.getenv("CHROMA_PATH", "./data/chroma_db")
+    parse_cache_path = os.getenv("PARSE_CACHE_PATH", "./data/parse_cache.pkl")
 
     print("="*60)
     print("🚀 Code Indexing Pipeline")
@@ -27,39 +35,53 @@ def main():
     print(f"   Vector DB: {chroma_path}")
     print("="*60)
 
-    # Step 1: Index all repos
-    print("\n[1/3] Indexing repositories...")
-    indexer = CodeIndexer(repos_path)
-    functions = indexer.index_all_repos()
+    # Step 1: Open vector database
+    print(f"\n[1/2] Opening vector database...")
+    store = VectorStore(persist_directory=chroma_path)
 
-    if not functions:
+    # Option to reset (clear existing data)
+    if len(sys.argv) > 1 and sys.argv[1] == "--reset":
+        print("⚠️  Resetting vector store (clearing existing data)...")
+        store.reset()
+
+    # Step 2: Index repos, embedding and storing batch by batch as functions
+    # are parsed - only one batch (plus its embeddings) is in memory at a time
+    print(f"\n[2/2] Indexing, embedding and storing (batches of {STREAM_BATCH})...")
+    indexer = CodeIndexer(repos_path, cache_path=parse_cache_path)
+    functions = indexer.iter_indexed_functions()
+    generator = store.embedding_generator
+    total = 0
+    failed_count = 0
+    duplicate_count = 0
+
+    while True:
+        batch = list(islice(functions, STREAM_BATCH))
+        if not batch:
+            break
+        total += len(batch)
+
+        # Identical content is embedded and stored once
+        unique = [f for f in batch if "duplicate_of" not in f.metadata]
+        duplicate_count += len(batch) - len(unique)
+        batch = unique
+        if not batch:
+            continue
+
+        embeddings = generator.generate_embeddings((f.content for f in batch), batch_size=100)
+        failed_count += sum(1 for e in embeddings if e is None)
+        store.add_functions(batch, embeddings)
+
+    if not total:
         print("❌ No functions found. Exiting.")
         return 1
 
-    # Step 2: Generate embeddings
-    print(f"\n[2/3] Generating embeddings...")
-    generator = EmbeddingGenerator()
-
-    # Extract content for embedding
-    texts = [f.content for f in functions]
-    embeddings = generator.generate_embeddings(texts, batch_size=100)
+    if duplicate_count:
+        print(f"♻️  Skipped {duplicate_count} duplicate functions (same content already stored)")
 
     # Check for failures
-    failed_count = sum(1 for e in embeddings if e is None)
     if failed_count > 0:
         print(f"⚠️  Warning: {failed_count} embeddings failed")
 
-    # Step 3: Store in vector database
-    print(f"\n[3/3] Storing in vector database...")
-    store = VectorStore(persist_directory=chroma_path)
-
-    # Option to reset (clear existing data)
-    if len(sys.argv) > 1 and sys.argv[1] == "--reset":
-        print("⚠️  Resetting vector store (clearing existing data)...")
-        store.reset()
-
-    store.add_functions(functions, embeddings)
-
     # Show stats
     print("\n" + "="*60)
     print("✅ Indexing complete!")
@@ -13,7 +13,9 @@ Setup Instructions:
 """
 
 import os
+import re
 import json
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional
 from dataclasses import dataclass
@@ -93,30 +95,44 @@ class GoCodeParser:
                 "tree-sitter not installed. Run: pip install tree-sitter tree-sitter-go"
             )
         
+        language = Language(tree_sitter_go.language())
         self.parser = Parser()
-        self.parser.set_language(Language(tree_sitter_go.language()))
+        self.parser.set_language(language)
+        
+        # Precompiled query - matching runs in C instead of a Python tree walk
+        self.func_query = language.query("""
+            (function_declaration name: (identifier) @name) @fn
+            (method_declaration name: (field_identifier) @name) @fn
+        """)
     
     def extract_functions(self, code: str, file_path: str) -> List[Dict]:
         """
         Extract function definitions from Go code
         Returns list of {content, metadata} dicts
         """
-        tree = self.parser.parse(bytes(code, "utf8"))
+        # Node offsets are byte offsets into the UTF-8 source, so slice the
+        # bytes (slicing the str would drift after any non-ASCII character)
+        code_bytes = code.encode("utf-8")
+        tree = self.parser.parse(code_bytes)
         root_node = tree.root_node
         
         chunks = []
         
         # Find package name
-        package_name = self._extract_package_name(root_node, code)
-        
-        # Find all function declarations
-        for node in self._traverse_tree(root_node):
-            if node.type in ["function_declaration", "method_declaration"]:
-                func_text = code[node.start_byte:node.end_byte]
-                func_name = self._extract_function_name(node, code)
+        package_name = self._extract_package_name(root_node, code_bytes)
+        
+        # Find all function/method declarations. Captures come back in source
+        # order, each @fn immediately followed by its @name
+        node = None
+        for captured, capture_name in self.func_query.captures(root_node):
+            if capture_name == "fn":
+                node = captured
+            else:
+                func_text = code_bytes[node.start_byte:node.end_byte].decode("utf-8")
+                func_name = code_bytes[captured.start_byte:captured.end_byte].decode("utf-8")
                 
                 # Get docstring if exists
-                docstring = self._extract_docstring(node, code)
+                docstring = self._extract_docstring(node, code_bytes)
                 
                 chunks.append({
                     "content": func_text,
@@ -134,38 +150,40 @@ class GoCodeParser:
         
         return chunks
     
-    def _traverse_tree(self, node):
-        """Recursively traverse syntax tree"""
-        yield node
-        for child in node.children:
-            yield from self._traverse_tree(child)
-    
-    def _extract_package_name(self, root_node, code: str) -> str:
+    def _extract_package_name(self, root_node, code_bytes: bytes) -> str:
         """Extract package name from Go file"""
         for node in root_node.children:
             if node.type == "package_clause":
                 # Get package identifier
                 for child in node.children:
                     if child.type == "package_identifier":
-                        return code[child.start_byte:child.end_byte]
+                        return code_bytes[child.start_byte:child.end_byte].decode("utf-8")
         return "unknown"
     
-    def _extract_function_name(self, func_node, code: str) -> str:
-        """Extract function name from function declaration node"""
-        for child in func_node.children:
-            if child.type == "identifier":
-                return code[child.start_byte:child.end_byte]
-        return "anonymous"
-    
-    def _extract_docstring(self, func_node, code: str) -> Optional[str]:
+    def _extract_docstring(self, func_node, code_bytes: bytes) -> Optional[str]:
         """Extract docstring/comment above function"""
         # Go uses comments directly above function
         # This is simplified - real implementation would look for comment nodes
-        lines = code[:func_node.start_byte].split('\n')
-        if len(lines) >= 2 and lines[-2].strip().startswith('//'):
-            return lines[-2].strip()
+        line_end = code_bytes.rfind(b'\n', 0, func_node.start_byte)
+        if line_end < 0:
+            return None
+        line_start = code_bytes.rfind(b'\n', 0, line_end) + 1
+        line = code_bytes[line_start:line_end].decode("utf-8").strip()
+        if line.startswith('//'):
+            return line
         return None
 
+# One parser per worker process (tree-sitter parsers can't be pickled)
+_worker_parser = None
+
+
+def _parse_go_file(code: str, file_path: str) -> List[Dict]:
+    """Process-pool entry point: extract function chunks from one Go file"""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = GoCodeParser()
+    return _worker_parser.extract_functions(code, file_path)
+
 # ============================================================================
 # CODE LOADER WITH METADATA
 # ============================================================================
@@ -173,22 +191,78 @@ class GoCodeParser:
 class CodebaseLoader:
     """Load codebase with proper metadata and chunking"""
     
+    # File extension -> language tag for document metadata
+    _LANG_MAP = {
+        '.go': 'go',
+        '.js': 'javascript',
+        '.ts': 'typescript',
+        '.py': 'python',
+        '.php': 'php'
+    }
+    
     def __init__(self, config: Config):
         self.config = config
         self.go_parser = GoCodeParser() if HAS_TREE_SITTER else None
+        self.exclude_re = self._compile_excludes(config.exclude_patterns)
+    
+    @staticmethod
+    def _compile_excludes(patterns: List[str]):
+        """
+        Compile exclude patterns into one regex over relative posix paths
+        "dir/" patterns match a whole path segment; anything else is a
+        substring (e.g. "_test.go")
+        """
+        if not patterns:
+            return None
+        
+        parts = [
+            r'(?:^|/)' + re.escape(p) if p.endswith('/') else re.escape(p)
+            for p in patterns
+        ]
+        return re.compile('|'.join(parts))
+    
+    def _list_files(self) -> List[str]:
+        """
+        Walk repos_path once, pruning excluded/hidden directories and
+        keeping files with a wanted extension that no pattern excludes
+        """
+        root = self.config.repos_path
+        exts = tuple(self.config.file_extensions)
+        exclude = self.exclude_re.search if self.exclude_re else (lambda _: None)
+        
+        files = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            rel_dir = os.path.relpath(dirpath, root).replace(os.sep, '/')
+            prefix = '' if rel_dir == '.' else rel_dir + '/'
+            
+            # Prune in place so excluded trees (vendor/, node_modules/) are never walked
+            dirnames[:] = [
+                d for d in dirnames
+                if not d.startswith('.') and not exclude(f"{prefix}{d}/")
+            ]
+            
+            for name in filenames:
+                if name.startswith('.') or not name.endswith(exts):
+                    continue
+                if not exclude(prefix + name):
+                    files.append(os.path.join(dirpath, name))
+        
+        return sorted(files)
     
     def load_documents(self) -> List[Document]:
         """Load all code files with metadata"""
         
         print(f"Loading documents from {self.config.repos_path}...")
         
-        # Use LlamaIndex's SimpleDirectoryReader
-        reader = SimpleDirectoryReader(
-            input_dir=self.config.repos_path,
-            required_exts=self.config.file_extensions,
-            recursive=True,
-            exclude=self.config.exclude_patterns
-        )
+        # Filter paths up front (one walk, one compiled regex) and hand
+        # LlamaIndex's SimpleDirectoryReader the final list - its own
+        # exclude= option re-globs the whole tree once per pattern
+        input_files = self._list_files()
+        if not input_files:
+            print("Loaded 0 files")
+            return []
+        
+        reader = SimpleDirectoryReader(input_files=input_files)
         
         documents = reader.load_data()
         print(f"Loaded {len(documents)} files")
@@ -207,58 +281,73 @@ class CodebaseLoader:
         return enhanced_docs
     
     def _chunk_go_files(self, documents: List[Document]) -> List[Document]:
-        """Chunk Go files by function"""
+        """
+        Chunk Go files by function (parsed in parallel, one process per
+        core; a single file is parsed inline with self.go_parser)
+        """
         enhanced = []
         
-        for doc in documents:
-            file_path = doc.metadata.get('file_path', '')
+        go_indices = {
+            i for i, doc in enumerate(documents)
+            if doc.metadata.get('file_path', '').endswith('.go')
+        }
+        
+        # A pool only pays off for more than one file
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count()) if len(go_indices) > 1 else None
+        try:
+            # Submit every Go file up front; results are consumed in input order
+            futures = {}
+            if executor:
+                futures = {
+                    i: executor.submit(_parse_go_file, documents[i].text,
+                                       documents[i].metadata.get('file_path', ''))
+                    for i in sorted(go_indices)
+                }
             
-            if file_path.endswith('.go'):
-                # Parse Go file into functions
-                try:
-                    chunks = self.go_parser.extract_functions(
-                        doc.text, 
-                        file_path
-                    )
-                    
-                    # Create Document for each function
-                    for chunk in chunks:
-                        func_doc = Document(
-                            text=chunk['content'],
-                            metadata=chunk['metadata']
-                        )
-                        enhanced.append(func_doc)
+            for i, doc in enumerate(documents):
+                file_path = doc.metadata.get('file_path', '')
                 
-                except Exception as e:
-                    print(f"Error parsing {file_path}: {e}")
-                    # Fall back to original document
+                if i in go_indices:
+                    # Parse Go file into functions
+                    try:
+                        if executor:
+                            chunks = futures[i].result()
+                        else:
+                            chunks = self.go_parser.extract_functions(doc.text, file_path)
+                        
+                        # Create Document for each function
+                        for chunk in chunks:
+                            func_doc = Document(
+                                text=chunk['content'],
+                                metadata=chunk['metadata']
+                            )
+                            enhanced.append(func_doc)
+                    
+                    except Exception as e:
+                        print(f"Error parsing {file_path}: {e}")
+                        # Fall back to original document
+                        enhanced.append(doc)
+                else:
+                    # Non-Go files: keep as-is
                     enhanced.append(doc)
-            else:
-                # Non-Go files: keep as-is
-                enhanced.append(doc)
+        finally:
+            if executor:
+                executor.shutdown()
         
         return enhanced
     
     def _enrich_metadata(self, doc: Document):
         """Add additional metadata to document"""
-        file_path = doc.metadata.get('file_path', '')
+        file_path = Path(doc.metadata.get('file_path', ''))
         
         # Extract repo name from path
-        path_parts = Path(file_path).parts
+        path_parts = file_path.parts
         if len(path_parts) > 0:
             doc.metadata['repo_name'] = path_parts[0]
         
         # Detect language if not set
         if 'language' not in doc.metadata:
-            ext = Path(file_path).suffix
-            lang_map = {
-                '.go': 'go',
-                '.js': 'javascript', 
-                '.ts': 'typescript',
-                '.py': 'python',
-                '.php': 'php'
-            }
-            doc.metadata['language'] = lang_map.get(ext, 'unknown')
+            doc.metadata['language'] = self._LANG_MAP.get(file_path.suffix, 'unknown')
         
         # File size
         doc.metadata['content_length'] = len(doc.text)
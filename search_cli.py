@@ -5,8 +5,11 @@ Search CLI - search for code functions using natural language queries.
 
 import sys
 import os
+import json
+from contextlib import redirect_stdout
 from dotenv import load_dotenv
 
+from src.search_protocol import RESULT_JSON_PREFIX
 from src.vector_store import VectorStore
 
 
@@ -41,11 +44,62 @@ def format_result(result: dict, index: int) -> str:
     return "\n".join(lines)
 
 
+def serve():
+    """
+    Persistent search worker - loads the vector store once, then answers
+    one JSON request per stdin line: {"query": ..., "limit": N, "type": T}
+
+    Writes a {"ready": true} line once initialized, then one JSON response
+    per request line to stdout. Everything else the store prints (init
+    banner, embedding progress) goes to stderr so stdout stays a clean
+    line protocol.
+    """
+    out = sys.stdout
+
+    with redirect_stdout(sys.stderr):
+        chroma_path = os.getenv("CHROMA_PATH", "./data/chroma_db")
+        store = VectorStore(persist_directory=chroma_path)
+
+    # Handshake so the caller can exclude startup from its timings
+    out.write(json.dumps({"ready": True}) + "\n")
+    out.flush()
+
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            request = json.loads(line)
+            filter_type = request.get("type")
+            metadata_filter = {"code_type": filter_type} if filter_type else None
+
+            with redirect_stdout(sys.stderr):
+                results = store.search(
+                    request["query"],
+                    n_results=request.get("limit", 5),
+                    filter_metadata=metadata_filter
+                )
+
+            response = {"count": len(results), "ids": [r["id"] for r in results]}
+        except Exception as e:
+            response = {"count": 0, "ids": [], "error": str(e)}
+
+        out.write(json.dumps(response) + "\n")
+        out.flush()
+
+    return 0
+
+
 def main():
     load_dotenv(override=True)
 
+    if "--server" in sys.argv:
+        return serve()
+
     if len(sys.argv) < 2:
-        print("Usage: python search_cli.py <query> [--limit N] [--type TYPE]")
+        print("Usage: python search_cli.py <query> [--limit N] [--type TYPE] [--json]")
+        print("       python search_cli.py --server   (JSON lines on stdin/stdout)")
         print("\nExamples:")
         print("  python search_cli.py \"JWT authentication\"")
         print("  python search_cli.py \"database transaction\" --limit 10")
@@ -56,6 +110,7 @@ def main():
     query = sys.argv[1]
     limit = 5
     filter_type = None
+    emit_json = "--json" in sys.argv
 
     if "--limit" in sys.argv:
         idx = sys.argv.index("--limit")
@@ -89,6 +144,8 @@ def main():
 
     if not results:
         print("❌ No results found.")
+        if emit_json:
+            print(RESULT_JSON_PREFIX + json.dumps({"count": 0}))
         return 0
 
     print(f"✅ Found {len(results)} results:\n")
@@ -100,6 +157,10 @@ def main():
     print(f"\n💡 Tip: Use --type to filter by code type:")
     print(f"   Available types: {', '.join(stats['types'].keys())}")
 
+    # Machine-readable summary for the benchmark runner (always the last line)
+    if emit_json:
+        print(RESULT_JSON_PREFIX + json.dumps({"count": len(results)}))
+
     return 0
 
 
@@ -3,21 +3,140 @@ Embeddings module - creates vector embeddings using OpenAI API.
 """
 
 import os
-from typing import List
+import base64
+import hashlib
+import logging
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
 from openai import OpenAI
 from tqdm import tqdm
 
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent embedding cache (SQLite), keyed by (model, sha256(text))
+
+    Re-indexing after minor edits only sends new/changed function bodies
+    to the API; everything else is served from disk. Vectors are stored as
+    float32 by default, so a hit is exactly what the API returned;
+    dtype="float16" halves the file (cosine ranking is unaffected at that
+    precision), and fresh vectors should then go through as_stored() so
+    what gets indexed doesn't depend on what was cached.
+
+    One connection is shared by every thread (e.g. the MCP server's request
+    workers), serialized by a lock.
+    """
+
+    # SQLite's default max host parameters per statement is 999
+    _LOOKUP_CHUNK = 500
+
+    def __init__(self, path: str, dtype: str = "float32"):
+        """
+        Open (or create) the cache database
+
+        Args:
+            path: SQLite file to store embeddings in
+            dtype: Storage precision for new vectors ("float16" or "float32")
+        """
+        self.path = Path(path)
+        self.dtype = np.dtype(dtype).name
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+            "dtype TEXT NOT NULL DEFAULT 'float32', PRIMARY KEY (model, text_hash))"
+        )
+        # Older caches predate the dtype column - their rows are float32
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(embeddings)")}
+        if "dtype" not in columns:
+            self.conn.execute(
+                "ALTER TABLE embeddings ADD COLUMN dtype TEXT NOT NULL DEFAULT 'float32'"
+            )
+        self.conn.commit()
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings for texts (None where not cached)"""
+        hashes = [self._hash(t) for t in texts]
+        found = {}
+
+        unique = list(dict.fromkeys(hashes))
+        for i in range(0, len(unique), self._LOOKUP_CHUNK):
+            chunk = unique[i:i + self._LOOKUP_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            with self._lock:
+                rows = self.conn.execute(
+                    f"SELECT text_hash, vector, dtype FROM embeddings "
+                    f"WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *chunk]
+                ).fetchall()
+            for text_hash, blob, dtype in rows:
+                found[text_hash] = np.frombuffer(blob, dtype=dtype).astype(np.float32)
+
+        return [found.get(h) for h in hashes]
+
+    def as_stored(self, embeddings: List[np.ndarray]) -> List[np.ndarray]:
+        """Embeddings rounded to the storage precision, as a later hit returns them"""
+        if self.dtype == "float32":
+            return embeddings
+        return [np.asarray(e, dtype=self.dtype).astype(np.float32) for e in embeddings]
+
+    def put_many(self, model: str, texts: List[str], embeddings: List[np.ndarray]):
+        """Store embeddings at the cache's storage precision"""
+        rows = [
+            (model, self._hash(t), np.asarray(e, dtype=self.dtype).tobytes(), self.dtype)
+            for t, e in zip(texts, embeddings)
+            if e is not None
+        ]
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, dtype) "
+                "VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.conn.commit()
+
 
 class EmbeddingGenerator:
     """Generate embeddings using OpenAI API"""
 
-    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small"):
+    # Output dimensions of the OpenAI embedding models
+    _DIM_TABLE = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+
+    def __init__(self, api_key: str = None, model: str = "text-embedding-3-small",
+                 cache_path: Optional[str] = None, max_concurrency: int = 8,
+                 cache_dtype: str = "float32"):
         """
         Initialize embedding generator
 
         Args:
             api_key: OpenAI API key (or from env)
             model: Embedding model to use
+            cache_path: SQLite embedding cache (or EMBEDDING_CACHE_PATH env var;
+                disabled if neither is set)
+            max_concurrency: Batches in flight at once (network-bound; keep
+                within your rate limit)
+            cache_dtype: Cache storage precision ("float32", or "float16"
+                for half the size - fresh vectors are then rounded the same
+                way, so cached and uncached runs embed identically)
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
@@ -25,61 +144,130 @@ class EmbeddingGenerator:
 
         self.client = OpenAI(api_key=self.api_key)
         self.model = model
+        self.max_concurrency = max_concurrency
 
-    def generate_embeddings(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
+        cache_path = cache_path or os.getenv("EMBEDDING_CACHE_PATH")
+        self.cache = EmbeddingCache(cache_path, dtype=cache_dtype) if cache_path else None
+
+    def generate_embeddings(self, texts: Iterable[str], batch_size: int = 100) -> List[Optional[np.ndarray]]:
         """
-        Generate embeddings for a list of texts
+        Generate embeddings for a sequence of texts
 
         Args:
-            texts: List of text strings to embed
+            texts: Text strings to embed - any iterable; a generator is consumed
+                lazily, one batch at a time
             batch_size: Number of texts to embed per API call
 
         Returns:
-            List of embedding vectors (each is list of floats)
+            List of embedding vectors (float32 arrays, None where the API call
+            failed), in input order
         """
+        total = len(texts) if hasattr(texts, "__len__") else None
+        logger.info("\n🔮 Generating embeddings (%s texts, batches of %d)...",
+                    total if total is not None else "?", batch_size)
+
         all_embeddings = []
+        cache_hits = 0
+
+        def embed_batch(batch_texts: List[str]) -> List[np.ndarray]:
+            # base64 is raw little-endian float32 - decoded straight into one
+            # (batch, dim) matrix instead of via a list of Python floats
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=batch_texts,
+                encoding_format="base64"
+            )
+            raw = bytearray().join(base64.b64decode(item.embedding) for item in response.data)
+            matrix = np.frombuffer(raw, dtype="<f4").reshape(len(response.data), -1)
+            return list(matrix)  # Row views - no per-row copies
+
+        # Several requests in flight at once, results placed back by index so
+        # ordering is preserved. In-flight batches are capped so a lazy input
+        # is never pulled far ahead of the API
+        max_in_flight = 2 * max(1, self.max_concurrency)
+        in_flight = {}  # future -> (batch number, indices, texts)
+        batch_num = 0
+
+        def collect(done):
+            for future in done:
+                n, batch_indices, batch_texts = in_flight.pop(future)
+
+                try:
+                    batch_embeddings = future.result()
+                except Exception as e:
+                    logger.error("❌ Error generating embeddings for batch %d: %s", n, e)
+                    # Failed embeddings stay None
+                    progress.update(len(batch_texts))
+                    continue
+
+                if self.cache:
+                    batch_embeddings = self.cache.as_stored(batch_embeddings)
+                    self.cache.put_many(self.model, batch_texts, batch_embeddings)
+
+                for j, embedding in zip(batch_indices, batch_embeddings):
+                    all_embeddings[j] = embedding
+                progress.update(len(batch_texts))
+
+        it = iter(texts)
+        pending_indices, pending_texts = [], []  # Cache misses not yet sent
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrency)) as executor, \
+                tqdm(total=total, desc="Embedding", unit=" texts") as progress:
+            while True:
+                chunk = list(islice(it, batch_size))
+                exhausted = not chunk
+
+                if chunk:
+                    start = len(all_embeddings)
+                    cached = (self.cache.get_many(self.model, chunk) if self.cache
+                              else [None] * len(chunk))
+                    all_embeddings.extend(cached)
 
-        print(f"\n🔮 Generating embeddings ({len(texts)} texts, batches of {batch_size})...")
+                    for i, embedding in enumerate(cached):
+                        if embedding is None:
+                            pending_indices.append(start + i)
+                            pending_texts.append(chunk[i])
+                    hits = len(chunk) - sum(e is None for e in cached)
+                    cache_hits += hits
+                    progress.update(hits)
 
-        # Process in batches
-        for i in tqdm(range(0, len(texts), batch_size), desc="Embedding batches"):
-            batch = texts[i:i + batch_size]
+                # Send full batches (and the remainder once input runs out)
+                while len(pending_texts) >= batch_size or (exhausted and pending_texts):
+                    if len(in_flight) >= max_in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done)
 
-            try:
-                response = self.client.embeddings.create(
-                    model=self.model,
-                    input=batch
-                )
+                    future = executor.submit(embed_batch, pending_texts[:batch_size])
+                    in_flight[future] = (batch_num, pending_indices[:batch_size], pending_texts[:batch_size])
+                    del pending_indices[:batch_size], pending_texts[:batch_size]
+                    batch_num += 1
 
-                # Extract embeddings from response
-                batch_embeddings = [item.embedding for item in response.data]
-                all_embeddings.extend(batch_embeddings)
+                if exhausted:
+                    break
 
-            except Exception as e:
-                print(f"\n❌ Error generating embeddings for batch {i//batch_size}: {e}")
-                # Return None for failed embeddings
-                all_embeddings.extend([None] * len(batch))
+            collect(as_completed(list(in_flight)))
 
-        print(f"✅ Generated {len([e for e in all_embeddings if e is not None])} embeddings")
+        if self.cache:
+            logger.info("💾 Embedding cache: %d hits, %d misses", cache_hits, len(all_embeddings) - cache_hits)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✅ Generated %d embeddings", sum(e is not None for e in all_embeddings))
 
         return all_embeddings
 
     def get_embedding_dimension(self) -> int:
         """Get the dimension of embeddings from this model"""
-        # text-embedding-3-small: 1536 dimensions
-        # text-embedding-3-large: 3072 dimensions
-        if "small" in self.model:
-            return 1536
-        elif "large" in self.model:
-            return 3072
-        else:
-            return 1536  # Default
+        dim = self._DIM_TABLE.get(self.model)
+        if dim is None:
+            # Unknown model name - fall back on its size suffix
+            dim = 3072 if "large" in self.model and "small" not in self.model else 1536
+        return dim
 
 
 if __name__ == "__main__":
     # Test embeddings
     from dotenv import load_dotenv
     load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     generator = EmbeddingGenerator()
 
@@ -94,5 +282,5 @@ if __name__ == "__main__":
 
     print(f"\n✅ Test successful!")
     print(f"   Embeddings generated: {len(embeddings)}")
-    print(f"   Dimensions: {len(embeddings[0]) if embeddings[0] else 'N/A'}")
-    print(f"   Sample (first 5 values): {embeddings[0][:5] if embeddings[0] else 'N/A'}")
+    print(f"   Dimensions: {len(embeddings[0]) if embeddings[0] is not None else 'N/A'}")
+    print(f"   Sample (first 5 values): {embeddings[0][:5] if embeddings[0] is not None else 'N/A'}")
@@ -4,18 +4,50 @@ Indexes ONLY production Go code (excludes tests, configs, generated files).
 """
 
 import os
+import hashlib
+import mmap
+import multiprocessing
+import pickle
+import queue
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice, repeat
 from pathlib import Path
-from typing import List, Dict
-from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from dataclasses import asdict, dataclass
 from tqdm import tqdm
 import json
 
 from .parser import GoParser, GoFunction
 
+# Parquet export of indexed functions (optional)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+
+    _FUNCTIONS_SCHEMA = pa.schema([("id", pa.string()), ("content", pa.string()), ("metadata", pa.string())])
+except ImportError:
+    HAS_PYARROW = False
+
+# orjson (optional) - faster JSON for save_index
+try:
+    import orjson
+
+    def _dumps_indented(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:  # stdlib fallback
+    def _dumps_indented(obj) -> bytes:
+        return json.dumps(obj, indent=2).encode()
+
 
 @dataclass
 class IndexedFunction:
     """Function with metadata ready for embedding"""
+    __slots__ = ('id', 'content', 'metadata')  # No per-instance __dict__
+
     id: str  # Unique ID: repo_name/file_path:function_name
     content: str  # What gets embedded
     metadata: Dict  # Additional info (file, line numbers, etc.)
@@ -24,8 +56,29 @@ class IndexedFunction:
 class CodeIndexer:
     """Crawls repositories and extracts functions from production code"""
 
-    def __init__(self, repos_path: str):
+    # Files handed to a pool worker per round trip (amortizes pickling/IPC)
+    PARSE_CHUNKSIZE = 16
+
+    # Chunks in flight per pool worker - parsed results wait here until the
+    # consumer catches up, so this (not the repo size) bounds their memory
+    PARSE_WINDOW = 4
+
+    # Bump whenever parsing or IndexedFunction construction changes, so a
+    # stale parse cache is discarded instead of served
+    PARSE_CACHE_VERSION = 1
+
+    def __init__(self, repos_path: str, workers: Optional[int] = None,
+                 cache_path: Optional[str] = None):
+        """
+        Args:
+            repos_path: Directory containing one sub-directory per repo
+            workers: Parser processes (default: CPU count; 1 parses in-process)
+            cache_path: Pickle file caching each file's functions by
+                (path, mtime, size) - unchanged files skip parsing
+                (disabled if None)
+        """
         self.repos_path = Path(repos_path)
+        self.workers = workers or os.cpu_count() or 1
         self.parser = GoParser()
         self.stats = {
             "total_files": 0,
@@ -33,10 +86,21 @@ class CodeIndexer:
             "skipped_vendor": 0,
             "skipped_generated": 0,
             "skipped_other": 0,
+            "pruned_dirs": 0,
             "indexed_files": 0,
+            "cached_files": 0,
             "total_functions": 0,
+            "duplicate_functions": 0,
         }
 
+        self.cache_path = Path(cache_path) if cache_path else None
+        self._parse_cache = self._load_parse_cache() if self.cache_path else None
+        self._cache_seen = set()  # Keys touched this run - the rest is dropped on save
+        self._cache_dirty = False
+
+        # Content digest -> id of the first function seen with that content
+        self._seen_content = {}
+
     def index_all_repos(self) -> List[IndexedFunction]:
         """
         Index all Go production code in all repositories
@@ -44,43 +108,208 @@ class CodeIndexer:
         Returns:
             List of IndexedFunction objects ready for embedding
         """
+        return list(self.iter_indexed_functions())
+
+    def iter_indexed_functions(self) -> Iterator[IndexedFunction]:
+        """
+        Index all Go production code in all repositories, lazily
+
+        Functions are yielded as their files are parsed, so a consumer
+        pulling fixed-size batches (itertools.islice) holds one batch, plus
+        at most PARSE_WINDOW chunks of parsed files per pool worker. The
+        parse cache is saved and stats printed once exhausted.
+
+        Yields:
+            IndexedFunction objects ready for embedding, in repo/file order
+        """
         print(f"\n📂 Indexing production Go code from: {self.repos_path}")
         print("   ℹ️  Excluding: tests, vendor, mocks, generated files, configs\n")
 
-        all_functions = []
         repos = [d for d in self.repos_path.iterdir() if d.is_dir() and not d.name.startswith('.')]
 
-        for repo in repos:
-            print(f"\n  📁 {repo.name}")
-            repo_functions = self.index_repo(repo)
-            all_functions.extend(repo_functions)
-            print(f"     ✓ {len(repo_functions)} functions")
-
+        # One worker pool shared by every repo. Spawned, not forked: callers
+        # (index_repos.py) have chromadb's threads running by now, and
+        # forking a process with live threads can deadlock the children
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        ) if self.workers > 1 else None
+        try:
+            # One repo-level bar; per-file updates cost more terminal
+            # writes than they're worth on large repos
+            for repo in tqdm(repos, desc="  Repos", unit="repo", mininterval=1.0):
+                tqdm.write(f"\n  📁 {repo.name}")
+                count = 0
+                for func in self.iter_repo(repo, executor):
+                    count += 1
+                    yield func
+                tqdm.write(f"     ✓ {count} functions")
+        finally:
+            if executor:
+                executor.shutdown()
+
+        self.save_parse_cache()
         self._print_stats()
-        return all_functions
 
-    def index_repo(self, repo_path: Path) -> List[IndexedFunction]:
-        """Index all production Go files in a single repository"""
-        functions = []
+    def index_repo(self, repo_path: Path,
+                   executor: Optional[ProcessPoolExecutor] = None) -> List[IndexedFunction]:
+        """
+        Index all production Go files in a single repository
 
-        # Find all .go files
-        go_files = list(repo_path.rglob("*.go"))
+        Args:
+            repo_path: Repository root
+            executor: Process pool to parse files in (parsed in-process if None)
+        """
+        return list(self.iter_repo(repo_path, executor))
+
+    def iter_repo(self, repo_path: Path,
+                  executor: Optional[ProcessPoolExecutor] = None) -> Iterator[IndexedFunction]:
+        """
+        Index all production Go files in a single repository, lazily
+
+        Args:
+            repo_path: Repository root
+            executor: Process pool to parse files in (parsed in-process if None)
+
+        Yields:
+            IndexedFunction objects, in file order
+        """
+        # Find all .go files. Vendor/mocks/testdata/generated directories are
+        # pruned, not walked - they only count in pruned_dirs, so total_files
+        # and skipped_* cover .go files outside them
+        go_files, pruned = _find_go_files(repo_path)
         self.stats["total_files"] += len(go_files)
+        self.stats["pruned_dirs"] += pruned
 
         # Filter to production code only
         production_files = [f for f in go_files if self._should_index_file(f)]
         self.stats["indexed_files"] += len(production_files)
 
-        for go_file in tqdm(production_files, desc=f"  {repo_path.name}", leave=False):
-            try:
-                file_functions = self._index_file(go_file, repo_path)
-                functions.extend(file_functions)
-                self.stats["total_functions"] += len(file_functions)
-            except Exception as e:
-                # Continue on error (encoding issues, parse errors, etc.)
-                pass
+        # Split into files unchanged since the last run (served from the
+        # cache) and files to parse
+        plan = []  # (file, cache key, stat signature, cached dicts or None)
+        for go_file in production_files:
+            key, signature = self._cache_key(go_file)
+            cached = self._parse_cache.get(key) if self._parse_cache is not None else None
+
+            if cached is not None and cached[0] == signature:
+                plan.append((go_file, key, signature, cached[1]))
+            else:
+                plan.append((go_file, key, signature, None))
+
+        # Parsing is CPU-bound - fan files out to the pool; results come
+        # back in file order, so they can be merged back lazily
+        parse_files = [f for f, _, _, cached in plan if cached is None]
+        if executor:
+            results = self._parse_in_pool(executor, parse_files, repo_path)
+        else:
+            results = map(self._safe_index_file, parse_files, repeat(repo_path))
+
+        for _, key, signature, cached in plan:
+            if cached is not None:
+                file_functions = [IndexedFunction(**d) for d in cached]
+                self._cache_seen.add(key)
+                self.stats["cached_files"] += 1
+            else:
+                file_functions = next(results)
+                if self._parse_cache is not None and signature is not None:
+                    self._parse_cache[key] = (signature, [asdict(f) for f in file_functions])
+                    self._cache_seen.add(key)
+                    self._cache_dirty = True
+
+            self.stats["total_functions"] += len(file_functions)
+            for func in file_functions:
+                yield self._mark_duplicate(func)
+
+    def _parse_in_pool(self, executor: ProcessPoolExecutor, files: List[Path],
+                       repo_path: Path) -> Iterator[List[IndexedFunction]]:
+        """
+        Parse files in the pool, yielding each file's functions in file order
+
+        Files go out PARSE_CHUNKSIZE per task with a bounded window of tasks
+        in flight, refilled as the consumer takes results (Executor.map
+        would submit the whole repo up front and hold all of it).
+        """
+        chunks = (files[i:i + self.PARSE_CHUNKSIZE] for i in range(0, len(files), self.PARSE_CHUNKSIZE))
+
+        in_flight = deque(
+            executor.submit(_index_files_worker, chunk, repo_path)
+            for chunk in islice(chunks, max(1, self.workers) * self.PARSE_WINDOW)
+        )
+        while in_flight:
+            chunk_results = in_flight.popleft().result()
+            chunk = next(chunks, None)
+            if chunk is not None:
+                in_flight.append(executor.submit(_index_files_worker, chunk, repo_path))
+            yield from chunk_results
+
+    def _mark_duplicate(self, func: IndexedFunction) -> IndexedFunction:
+        """
+        Flag a function whose content was already seen this run
+
+        Copy-pasted helpers and in-tree copies of libraries produce
+        byte-identical functions; a duplicate gets metadata["duplicate_of"]
+        (the id of the first copy) so the embedding side can skip it.
+        Runs in the main process, so it sees every repo and worker.
+        """
+        digest = hashlib.blake2b(func.content.encode("utf-8"), digest_size=16).digest()
+        primary = self._seen_content.setdefault(digest, func.id)
+        if primary == func.id:
+            return func
+
+        self.stats["duplicate_functions"] += 1
+        # New dict - cached metadata must stay as parsed
+        return IndexedFunction(id=func.id, content=func.content,
+                               metadata={**func.metadata, "duplicate_of": primary})
+
+    @staticmethod
+    def _cache_key(file_path: Path):
+        """Parse cache key (absolute path) and signature ((mtime_ns, size), or None)"""
+        key = str(file_path.absolute())
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return key, None
+        return key, (st.st_mtime_ns, st.st_size)
 
-        return functions
+    def _load_parse_cache(self) -> Dict:
+        """Load the parse cache (empty if missing, unreadable or another version)"""
+        try:
+            with open(self.cache_path, 'rb') as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+            return {}
+
+        if not isinstance(data, dict) or data.get("version") != self.PARSE_CACHE_VERSION:
+            return {}
+        return data.get("entries", {})
+
+    def save_parse_cache(self):
+        """Write the parse cache (entries for files not seen this run are dropped)"""
+        if self._parse_cache is None:
+            return
+        if not self._cache_dirty and self._cache_seen == set(self._parse_cache):
+            return
+
+        entries = {k: v for k, v in self._parse_cache.items() if k in self._cache_seen}
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write-then-rename so an interrupted run never leaves a torn cache
+        tmp_path = self.cache_path.with_suffix(self.cache_path.suffix + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({"version": self.PARSE_CACHE_VERSION, "entries": entries}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.cache_path)
+
+        self._parse_cache = entries
+        self._cache_dirty = False
+
+    def _safe_index_file(self, file_path: Path, repo_path: Path) -> List[IndexedFunction]:
+        """_index_file, but an unparseable file yields no functions instead of raising"""
+        try:
+            return self._index_file(file_path, repo_path)
+        except Exception:
+            # Continue on error (encoding issues, parse errors, etc.)
+            return []
 
     def _should_index_file(self, file_path: Path) -> bool:
         """
@@ -90,26 +319,21 @@ class CodeIndexer:
         EXCLUDES: Tests, vendor, mocks, generated, configs
         """
         path_str = str(file_path)
-        filename = file_path.name
 
         # SKIP: Test files
-        if '_test.go' in filename:
+        if '_test.go' in file_path.name:
             self.stats["skipped_tests"] += 1
             return False
 
         # SKIP: Vendor and mocks
-        vendor_patterns = ['/vendor/', '/mocks/', '/mock_', '/testdata/']
-        for pattern in vendor_patterns:
-            if pattern in path_str:
-                self.stats["skipped_vendor"] += 1
-                return False
-
-        # SKIP: Generated files
-        generated_patterns = ['.pb.go', '.gen.go', 'generated']
-        for pattern in generated_patterns:
-            if pattern in filename.lower() or pattern in path_str.lower():
-                self.stats["skipped_generated"] += 1
-                return False
+        if _VENDOR_RE.search(path_str):
+            self.stats["skipped_vendor"] += 1
+            return False
+
+        # SKIP: Generated files (the filename is part of the path)
+        if _GENERATED_RE.search(path_str.lower()):
+            self.stats["skipped_generated"] += 1
+            return False
 
         # ONLY: .go files (this filters out YAML, JSON, etc.)
         if file_path.suffix != '.go':
@@ -121,67 +345,59 @@ class CodeIndexer:
     def _index_file(self, file_path: Path, repo_path: Path) -> List[IndexedFunction]:
         """Index a single Go file"""
         try:
-            content = file_path.read_text(encoding='utf-8')
-        except (UnicodeDecodeError, PermissionError):
+            buf = _mmap_file(file_path)
+        except (PermissionError, ValueError):
+            # ValueError: empty file (nothing to map)
             return []
 
-        # Parse file
-        functions = self.parser.parse_file(str(file_path), content)
+        # Parse straight from the mapping - no read buffer copy, no decode
+        # of the whole file; only extracted pieces are decoded
+        with buf:
+            functions = self.parser.parse_file(str(file_path), buf)
 
         # Convert to IndexedFunction
-        indexed = []
-        repo_name = repo_path.name
-        rel_path = file_path.relative_to(repo_path)
-
-        for func in functions:
-            indexed_func = self._create_indexed_function(func, repo_name, str(rel_path))
-            indexed.append(indexed_func)
-
-        return indexed
-
-    def _create_indexed_function(self, func: GoFunction, repo_name: str, rel_path: str) -> IndexedFunction:
-        """Convert GoFunction to IndexedFunction with metadata"""
-
-        # Create unique ID
-        func_id = f"{repo_name}/{rel_path}:{func.name}"
+        return self._create_indexed_functions(functions, repo_path.name,
+                                              str(file_path.relative_to(repo_path)))
 
-        # Create content for embedding
-        # Include: docstring + signature + body (truncated to 500 chars)
-        content_parts = []
+    def _create_indexed_functions(self, functions: List[GoFunction], repo_name: str,
+                                  rel_path: str) -> List[IndexedFunction]:
+        """Convert one file's GoFunctions to IndexedFunctions with metadata"""
 
-        if func.docstring:
-            content_parts.append(func.docstring)
+        # Everything that depends only on the file is worked out once, not
+        # per function. Repo, file, code type and receiver repeat across many
+        # functions - intern them so every metadata dict shares one copy of each
+        repo_name = sys.intern(repo_name)
+        rel_path = sys.intern(rel_path)
+        code_type = sys.intern(self._detect_code_type(rel_path))
+        id_prefix = f"{repo_name}/{rel_path}:"  # Unique ID: repo_name/file_path:function_name
 
-        content_parts.append(func.signature)
-
-        # Truncate body if too long
-        body_preview = func.body[:500] if len(func.body) > 500 else func.body
-        content_parts.append(body_preview)
-
-        content = "\n".join(content_parts)
-
-        # Detect code type from path
-        code_type = self._detect_code_type(rel_path)
+        indexed = []
+        for func in functions:
+            # Create content for embedding
+            # Include: docstring + signature + body (truncated to 500 chars)
+            body_preview = func.body[:500]
+            if func.docstring:
+                content = "\n".join((func.docstring, func.signature, body_preview))
+            else:
+                content = "\n".join((func.signature, body_preview))
+
+            # Create metadata (Chroma doesn't accept None values)
+            metadata = {
+                "repo": repo_name,
+                "file": rel_path,
+                "function": func.name,
+                "start_line": func.start_line,
+                "end_line": func.end_line,
+                "lines_of_code": func.end_line - func.start_line + 1,
+                "has_docstring": func.docstring is not None,
+                "is_method": func.receiver is not None,
+                "receiver": sys.intern(func.receiver) if func.receiver else "",
+                "code_type": code_type,
+            }
 
-        # Create metadata (Chroma doesn't accept None values)
-        metadata = {
-            "repo": repo_name,
-            "file": rel_path,
-            "function": func.name,
-            "start_line": func.start_line,
-            "end_line": func.end_line,
-            "lines_of_code": func.end_line - func.start_line + 1,
-            "has_docstring": func.docstring is not None,
-            "is_method": func.receiver is not None,
-            "receiver": func.receiver if func.receiver else "",
-            "code_type": code_type,
-        }
+            indexed.append(IndexedFunction(id_prefix + func.name, content, metadata))
 
-        return IndexedFunction(
-            id=func_id,
-            content=content,
-            metadata=metadata
-        )
+        return indexed
 
     def _detect_code_type(self, file_path: str) -> str:
         """Heuristically determine code type from file path"""
@@ -213,34 +429,192 @@ class CodeIndexer:
         print(f"  Skipped (tests):           {self.stats['skipped_tests']:>6}")
         print(f"  Skipped (vendor/mocks):    {self.stats['skipped_vendor']:>6}")
         print(f"  Skipped (generated):       {self.stats['skipped_generated']:>6}")
+        print(f"  Pruned dirs (not walked):  {self.stats['pruned_dirs']:>6}")
         print(f"  Indexed (production):      {self.stats['indexed_files']:>6}")
+        if self.cache_path:
+            print(f"    ...unchanged (cached):   {self.stats['cached_files']:>6}")
         print(f"  {'─'*60}")
         print(f"  Total functions extracted: {self.stats['total_functions']:>6}")
+        print(f"    ...duplicates of another: {self.stats['duplicate_functions']:>6}")
         print(f"{'='*60}\n")
 
-    def save_index(self, functions: List[IndexedFunction], output_path: str):
-        """Save indexed functions to JSON (for inspection/debugging)"""
+    def save_index(self, functions: Iterable[IndexedFunction], output_path: str):
+        """
+        Save indexed functions to JSON (for inspection/debugging)
+
+        Written one function at a time, so a generator (e.g.
+        iter_indexed_functions) is never materialized as a list.
+        """
         output = Path(output_path)
         output.parent.mkdir(parents=True, exist_ok=True)
 
-        data = [
-            {
-                "id": f.id,
-                "content_preview": f.content[:150] + "..." if len(f.content) > 150 else f.content,
-                "metadata": f.metadata
-            }
-            for f in functions
-        ]
-
-        with open(output, 'w') as f:
-            json.dump(data, f, indent=2)
+        with open(output, 'wb') as out:
+            # Same layout as json.dump(list, indent=2): each element
+            # indented one level inside the array
+            out.write(b"[")
+            empty = True
+            for f in functions:
+                item = _dumps_indented({
+                    "id": f.id,
+                    "content_preview": f.content[:150] + "..." if len(f.content) > 150 else f.content,
+                    "metadata": f.metadata
+                })
+                out.write(b"\n  " if empty else b",\n  ")
+                out.write(item.replace(b"\n", b"\n  "))
+                empty = False
+            out.write(b"]" if empty else b"\n]")
 
         print(f"💾 Saved index preview to: {output}")
 
+    def save_functions(self, functions: Iterable[IndexedFunction], output_path: str,
+                       row_group_size: int = 1000):
+        """
+        Export indexed functions to Parquet (full content, columnar + zstd)
+
+        Not part of index_repos.py, which streams functions straight into
+        the store - this is for handing a parsed corpus to other tools (or
+        re-embedding it) without re-parsing. Written one row group at a
+        time, so iter_indexed_functions() can be passed in directly.
+
+        Args:
+            functions: Functions to save - any iterable, consumed lazily
+            output_path: Parquet file to write
+            row_group_size: Rows per row group - read back one group at a
+                time by iter_function_batches
+        """
+        if not HAS_PYARROW:
+            raise ImportError("pyarrow not installed. Run: pip install pyarrow")
+
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+
+        # Metadata goes in as JSON text - its keys vary between functions
+        # (duplicate_of), which a struct column can't hold across row groups
+        it = iter(functions)
+        count = 0
+        with pq.ParquetWriter(str(output), _FUNCTIONS_SCHEMA, compression="zstd") as writer:
+            while True:
+                batch = list(islice(it, row_group_size))
+                if not batch:
+                    break
+                writer.write_table(pa.table({
+                    "id": [f.id for f in batch],
+                    "content": [f.content for f in batch],
+                    "metadata": [json.dumps(f.metadata) for f in batch],
+                }, schema=_FUNCTIONS_SCHEMA), row_group_size=row_group_size)
+                count += len(batch)
+
+        print(f"💾 Saved {count} functions to: {output}")
+
+
+# Exclusion filters for _should_index_file - each group is one compiled
+# scan per path instead of a Python loop of substring checks
+_VENDOR_RE = re.compile('|'.join(map(re.escape, ['/vendor/', '/mocks/', '/mock_', '/testdata/'])))
+_GENERATED_RE = re.compile('|'.join(map(re.escape, ['.pb.go', '.gen.go', 'generated'])))  # Lowercased path
+
+# Scanner threads for _find_go_files (directory listing is I/O-bound)
+SCAN_THREADS = 8
+
+
+def _is_excluded_dir(name: str) -> bool:
+    """
+    True if every .go file under a directory with this name would be
+    rejected by CodeIndexer._should_index_file anyway, so it needn't be walked
+    """
+    lower = name.lower()
+    return (name in ('vendor', 'mocks', 'testdata') or name.startswith('mock_')
+            or 'generated' in lower or '.pb.go' in lower or '.gen.go' in lower)
+
+
+def _find_go_files(root: Path) -> Tuple[List[Path], int]:
+    """
+    Find .go files under root with concurrent os.scandir calls
+
+    Entry types come from the directory listing itself (no stat per
+    entry, unlike Path.rglob), symlinked directories aren't followed, and
+    excluded directories are pruned instead of walked.
+
+    Returns:
+        (sorted list of .go file paths, number of directories pruned)
+    """
+    found = []
+    pruned = []
+    dirs = queue.Queue()
+    dirs.put(str(root))
+
+    def scan():
+        while True:
+            path = dirs.get()
+            if path is None:
+                return
+            try:
+                with os.scandir(path) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            if _is_excluded_dir(entry.name):
+                                pruned.append(entry.path)
+                            else:
+                                dirs.put(entry.path)
+                        elif entry.name.endswith('.go'):
+                            found.append(entry.path)  # list.append is atomic
+            except OSError:
+                pass  # Unreadable directory - skip it
+            finally:
+                dirs.task_done()
+
+    with ThreadPoolExecutor(max_workers=SCAN_THREADS) as executor:
+        for _ in range(SCAN_THREADS):
+            executor.submit(scan)
+        dirs.join()  # Every queued directory scanned
+        for _ in range(SCAN_THREADS):
+            dirs.put(None)
+
+    return [Path(p) for p in sorted(found)], len(pruned)
+
+
+def _mmap_file(path: Path) -> mmap.mmap:
+    """Map a file read-only (raises ValueError for an empty file)"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    finally:
+        os.close(fd)  # The mapping keeps its own reference
+
+
+# One indexer (and tree-sitter parser) per worker process - parsers can't be pickled
+_worker_indexer = None
+
+
+def _index_files_worker(file_paths: List[Path], repo_path: Path) -> List[List[IndexedFunction]]:
+    """Process-pool entry point: index a chunk of Go files"""
+    global _worker_indexer
+    if _worker_indexer is None:
+        _worker_indexer = CodeIndexer(str(repo_path), workers=1)
+    return [_worker_indexer._safe_index_file(f, repo_path) for f in file_paths]
+
+
+def iter_function_batches(path: str, batch_size: int = 1000) -> Iterator[List[IndexedFunction]]:
+    """
+    Stream functions saved by CodeIndexer.save_functions, a batch at a time
+
+    Args:
+        path: Parquet file to read
+        batch_size: Functions per yielded batch
+
+    Yields:
+        Lists of IndexedFunction objects, in saved order
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow not installed. Run: pip install pyarrow")
+
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=batch_size):
+        yield [IndexedFunction(row["id"], row["content"], json.loads(row["metadata"]))
+               for row in batch.to_pylist()]
+
 
 if __name__ == "__main__":
     # Test indexer
-    import sys
     from dotenv import load_dotenv
 
     load_dotenv()
@@ -9,11 +9,64 @@ Compatible with Python 3.9+ (no MCP SDK required)
 import sys
 import json
 import os
-from typing import Dict, List, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Optional
 from dotenv import load_dotenv
 
-from .vector_store import VectorStore
-from .indexer import CodeIndexer
+if TYPE_CHECKING:
+    from .vector_store import VectorStore
+
+# orjson (optional) - C-level JSON for the request/response hot path
+try:
+    import orjson
+
+    def _dumps_text(obj) -> str:
+        """Pretty-printed JSON for tool/resource text payloads"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    _dumps_line = orjson.dumps
+    _loads = orjson.loads
+except ImportError:  # stdlib fallback
+    def _dumps_text(obj) -> str:
+        """Pretty-printed JSON for tool/resource text payloads"""
+        return json.dumps(obj, indent=2)
+
+    def _dumps_line(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+# Bytes requested per read() on stdin
+STDIN_BUFFER_SIZE = 65536
+
+
+def _read_batches(fd: int) -> Iterator[List[bytes]]:
+    """
+    Yield the newline-delimited messages available on fd, one read at a time
+
+    Each read returns whatever the client has written so far, so requests
+    that were pipelined (sent without waiting for a response) arrive together
+    and can be handled as a batch.
+
+    Yields:
+        Non-empty lists of stripped, non-blank lines (a trailing partial
+        line is held back until the rest of it arrives)
+    """
+    pending = b""
+    while True:
+        chunk = os.read(fd, STDIN_BUFFER_SIZE)
+        if not chunk:  # EOF
+            if pending.strip():
+                yield [pending.strip()]
+            return
+
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        lines = [line.strip() for line in lines if line.strip()]
+        if lines:
+            yield lines
 
 # Load environment
 load_dotenv()
@@ -22,23 +75,65 @@ load_dotenv()
 class MCPServer:
     """Lightweight MCP server implementing JSON-RPC protocol"""
 
+    # Seconds a get_stats() result is reused - the index is only written
+    # out-of-band by index_repos.py, so it rarely changes under a server
+    STATS_TTL = 5.0
+
+    # Requests handled at once; reading stdin pauses while this many are in
+    # flight. Tool calls mostly wait on the network (embedding API), so a
+    # slow search no longer holds up the requests behind it
+    MAX_CONCURRENT_REQUESTS = 16
+
     def __init__(self):
-        """Initialize MCP server with vector store"""
+        """Initialize MCP server (the vector store is opened on first use)"""
         chroma_path = os.getenv("CHROMA_PATH", "./data/chroma_db")
         repos_path = os.getenv("REPOS_PATH", "./repos")
 
-        self.vector_store = VectorStore(persist_directory=chroma_path)
+        self._chroma_path = chroma_path
+        self._vector_store = None
         self.repos_path = repos_path
+        self._stats_cache = None
+        self._stats_ts = 0.0
+        self._prefetched = {}  # (query, limit, code_type) -> results from a batched search
+        self._store_lock = threading.Lock()
+        self._send_lock = threading.Lock()
 
         # Log to stderr (stdout is for JSON-RPC)
         self.log("Company Patterns MCP Server initialized")
         self.log(f"Vector DB: {chroma_path}")
-        self.log(f"Indexed functions: {self.vector_store.collection.count()}")
+
+    @property
+    def vector_store(self) -> "VectorStore":
+        """
+        Vector store, opened on first use
+
+        Importing chromadb/openai and opening the collection takes over a
+        second, so the server answers initialize/tools/list right away and
+        only pays for it on the first search. Safe to reach from several
+        request workers at once.
+        """
+        if self._vector_store is None:
+            with self._store_lock:  # Concurrent first requests open it once
+                if self._vector_store is None:
+                    from .vector_store import VectorStore
+
+                    store = VectorStore(persist_directory=self._chroma_path)
+                    self.log(f"Indexed functions: {store.collection.count()}")
+                    self._vector_store = store
+        return self._vector_store
 
     def log(self, message: str):
         """Log to stderr (stdout is for JSON-RPC protocol)"""
         print(f"[MCP Server] {message}", file=sys.stderr, flush=True)
 
+    def _cached_stats(self) -> Dict[str, Any]:
+        """VectorStore.get_stats(), memoized for STATS_TTL seconds"""
+        now = time.monotonic()
+        if self._stats_cache is None or now - self._stats_ts > self.STATS_TTL:
+            self._stats_cache = self.vector_store.get_stats()
+            self._stats_ts = now
+        return self._stats_cache
+
     def handle_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Handle incoming JSON-RPC request"""
         method = request.get("method")
@@ -144,8 +239,10 @@ class MCPServer:
         # Build metadata filter
         filter_metadata = {"code_type": code_type} if code_type else None
 
-        # Search
-        results = self.vector_store.search(query, n_results=limit, filter_metadata=filter_metadata)
+        # Search (unless already done as part of a batch)
+        results = self._prefetched.pop((query, limit, code_type), None)
+        if results is None:
+            results = self.vector_store.search(query, n_results=limit, filter_metadata=filter_metadata)
 
         # Format for MCP
         formatted_results = []
@@ -171,31 +268,31 @@ class MCPServer:
             "content": [
                 {
                     "type": "text",
-                    "text": json.dumps({
+                    "text": _dumps_text({
                         "query": query,
                         "results_count": len(formatted_results),
                         "results": formatted_results
-                    }, indent=2)
+                    })
                 }
             ]
         }
 
     def tool_get_stats(self) -> Dict[str, Any]:
         """Get codebase statistics"""
-        stats = self.vector_store.get_stats()
+        stats = self._cached_stats()
 
         return {
             "content": [
                 {
                     "type": "text",
-                    "text": json.dumps(stats, indent=2)
+                    "text": _dumps_text(stats)
                 }
             ]
         }
 
     def handle_resources_list(self) -> Dict[str, Any]:
         """List available resources"""
-        stats = self.vector_store.get_stats()
+        stats = self._cached_stats()
 
         resources = [
             {
@@ -222,13 +319,13 @@ class MCPServer:
         uri = params.get("uri")
 
         if uri == "codebase://stats":
-            stats = self.vector_store.get_stats()
+            stats = self._cached_stats()
             return {
                 "contents": [
                     {
                         "uri": uri,
                         "mimeType": "application/json",
-                        "text": json.dumps(stats, indent=2)
+                        "text": _dumps_text(stats)
                     }
                 ]
             }
@@ -237,7 +334,7 @@ class MCPServer:
         if uri.startswith("codebase://"):
             repo_name = uri.replace("codebase://", "")
             # Get all functions from this repo
-            stats = self.vector_store.get_stats()
+            stats = self._cached_stats()
 
             if repo_name in stats.get("repos", {}):
                 return {
@@ -245,11 +342,11 @@ class MCPServer:
                         {
                             "uri": uri,
                             "mimeType": "application/json",
-                            "text": json.dumps({
+                            "text": _dumps_text({
                                 "repo": repo_name,
                                 "function_count": stats["repos"][repo_name],
                                 "note": "Use search_code tool to find specific functions"
-                            }, indent=2)
+                            })
                         }
                     ]
                 }
@@ -275,24 +372,109 @@ class MCPServer:
             }
         }
 
+    def send(self, message: Dict[str, Any]):
+        """Write one JSON-RPC message (newline-delimited) to stdout"""
+        line = _dumps_line(message) + b"\n"
+        with self._send_lock:  # Whole lines only, from any worker thread
+            sys.stdout.flush()  # Anything already printed in text mode goes first
+            out = sys.stdout.buffer
+            out.write(line)
+            out.flush()
+
+    def _respond(self, request: Dict[str, Any]):
+        """Handle one request and send its response"""
+        self.send(self.handle_request(request))
+
+    def _respond_searches(self, queries: List[str], limit: Any, code_type: Any,
+                          requests: List[Dict[str, Any]]):
+        """
+        Handle search_code calls sharing limit and code_type as one batch
+
+        The queries are embedded in one API call and sent to Chroma as one
+        multi-query; each tool_search_code then picks its results up from
+        self._prefetched.
+        """
+        filter_metadata = {"code_type": code_type} if code_type else None
+        try:
+            results = self.vector_store.search_batch(queries, n_results=limit,
+                                                     filter_metadata=filter_metadata)
+        except Exception as e:
+            # Each call falls back to its own search (and its own error)
+            self.log(f"Batched search failed, searching one by one: {e}")
+        else:
+            for query, query_results in zip(queries, results):
+                self._prefetched[(query, limit, code_type)] = query_results
+
+        for request in requests:
+            self._respond(request)
+
+    def _plan_batch(self, requests: List[Dict[str, Any]]) -> List[tuple]:
+        """
+        Split a batch of requests into units of work
+
+        search_code calls sharing limit and code_type are grouped into one
+        _respond_searches unit; everything else is one _respond each.
+
+        Returns:
+            (function, *args) tuples
+        """
+        groups = {}  # (limit, code_type) -> (queries, requests)
+        singles = []
+        for request in requests:
+            params = request.get("params") if isinstance(request, dict) else None
+            args = params.get("arguments") if isinstance(params, dict) else None
+            query = args.get("query") if isinstance(args, dict) else None
+            if not (isinstance(query, str) and query and request.get("method") == "tools/call"
+                    and params.get("name") == "search_code"):
+                singles.append(request)
+                continue
+
+            try:
+                queries, grouped = groups.setdefault((args.get("limit", 5), args.get("code_type")), ([], []))
+            except TypeError:  # Unhashable limit/code_type - let the tool report it
+                singles.append(request)
+                continue
+            queries.append(query)
+            grouped.append(request)
+
+        units = []
+        for (limit, code_type), (queries, grouped) in groups.items():
+            if len(grouped) > 1:
+                units.append((self._respond_searches, queries, limit, code_type, grouped))
+            else:
+                singles.extend(grouped)
+        units.extend((self._respond, request) for request in singles)
+        return units
+
     def run(self):
         """Main server loop - read from stdin, write to stdout"""
         self.log("Server started, waiting for requests...")
 
+        # Requests are handled on worker threads and answered as they finish
+        # (JSON-RPC matches responses by id, not order)
+        slots = threading.BoundedSemaphore(self.MAX_CONCURRENT_REQUESTS)
+
+        def done(future):
+            slots.release()
+            if future.exception() is not None:
+                self.log(f"Error responding: {future.exception()}")
+
         try:
-            for line in sys.stdin:
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    request = json.loads(line)
-                    response = self.handle_request(request)
-                    print(json.dumps(response), flush=True)
-                except json.JSONDecodeError as e:
-                    self.log(f"Invalid JSON: {e}")
-                    error = self.error_response(None, -32700, "Parse error")
-                    print(json.dumps(error), flush=True)
+            with ThreadPoolExecutor(max_workers=self.MAX_CONCURRENT_REQUESTS) as executor:
+                for lines in _read_batches(sys.stdin.buffer.fileno()):
+                    requests = []
+                    for line in lines:
+                        try:
+                            requests.append(_loads(line))
+                        except ValueError as e:  # JSONDecodeError, or invalid UTF-8
+                            self.log(f"Invalid JSON: {e}")
+                            self.send(self.error_response(None, -32700, "Parse error"))
+
+                    for fn, *args in self._plan_batch(requests):
+                        slots.acquire()
+                        executor.submit(fn, *args).add_done_callback(done)
+
+                # Leaving the with block waits for in-flight requests
 
         except KeyboardInterrupt:
             self.log("Server stopped")
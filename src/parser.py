@@ -4,7 +4,7 @@ Extracts functions with metadata for embedding.
 """
 
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Union
 import tree_sitter
 from tree_sitter_languages import get_language
 
@@ -23,6 +23,11 @@ class GoFunction:
     receiver: Optional[str] = None  # For methods: (r *Receiver)
 
 
+def _decode(raw: bytes) -> str:
+    """Decode a slice of the source (bad bytes become U+FFFD, not an error)"""
+    return raw.decode("utf-8", errors="replace")
+
+
 class GoParser:
     """Parse Go source code and extract functions"""
 
@@ -31,33 +36,39 @@ class GoParser:
         self.parser = tree_sitter.Parser()
         self.parser.set_language(language)
 
-    def parse_file(self, file_path: str, content: str) -> List[GoFunction]:
+    def parse_file(self, file_path: str, content: Union[str, bytes, memoryview]) -> List[GoFunction]:
         """
         Extract all functions from a Go file
 
         Args:
             file_path: Path to the Go file (for metadata)
-            content: File content as string
+            content: File content - UTF-8 bytes or any bytes-like buffer
+                (e.g. an mmap, parsed without copying), or a str
 
         Returns:
             List of GoFunction objects
         """
-        tree = self.parser.parse(bytes(content, "utf8"))
+        # Node offsets are byte offsets, so everything below slices the
+        # UTF-8 buffer and decodes only the pieces that are kept
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+
+        tree = self.parser.parse(content)
         root = tree.root_node
 
         functions = []
 
         # Find all function and method declarations
-        for node in self._traverse(root):
-            if node.type in ["function_declaration", "method_declaration"]:
-                func = self._extract_function(node, content, file_path)
-                if func:
-                    functions.append(func)
+        for node, comments in self._top_level(root):
+            func = self._extract_function(node, content, file_path, comments)
+            if func:
+                functions.append(func)
 
         return functions
 
-    def _extract_function(self, node, content: str, file_path: str) -> Optional[GoFunction]:
-        """Extract function details from AST node"""
+    def _extract_function(self, node, content: bytes, file_path: str,
+                          comments: List = ()) -> Optional[GoFunction]:
+        """Extract function details from AST node (comments: the comment nodes right above it)"""
         try:
             # Get function name
             name = self._get_function_name(node, content)
@@ -68,21 +79,21 @@ class GoParser:
             receiver = self._get_receiver(node, content)
 
             # Get docstring (comment above function)
-            docstring = self._get_docstring(node, content)
+            docstring = self._get_docstring(comments, content)
 
             # Get full function code
-            full_code = content[node.start_byte:node.end_byte]
+            full_code = _decode(content[node.start_byte:node.end_byte])
 
             # Get signature (first line)
-            signature_end = content.find('\n', node.start_byte)
+            signature_end = content.find(b'\n', node.start_byte)
             if signature_end == -1:
                 signature_end = node.end_byte
-            signature = content[node.start_byte:signature_end].strip()
+            signature = _decode(content[node.start_byte:signature_end]).strip()
 
             # Get body (everything after signature)
-            body_start = content.find('{', node.start_byte)
+            body_start = content.find(b'{', node.start_byte)
             if body_start != -1:
-                body = content[body_start:node.end_byte]
+                body = _decode(content[body_start:node.end_byte])
             else:
                 body = full_code
 
@@ -102,14 +113,14 @@ class GoParser:
             print(f"Error extracting function: {e}")
             return None
 
-    def _get_function_name(self, node, content: str) -> Optional[str]:
+    def _get_function_name(self, node, content: bytes) -> Optional[str]:
         """Extract function/method name"""
         for child in node.children:
             if child.type == "identifier":
-                return content[child.start_byte:child.end_byte]
+                return _decode(content[child.start_byte:child.end_byte])
         return None
 
-    def _get_receiver(self, node, content: str) -> Optional[str]:
+    def _get_receiver(self, node, content: bytes) -> Optional[str]:
         """Extract receiver for methods (e.g., (s *Service))"""
         if node.type != "method_declaration":
             return None
@@ -117,29 +128,39 @@ class GoParser:
         for child in node.children:
             if child.type == "parameter_list":
                 # This is the receiver
-                return content[child.start_byte:child.end_byte]
+                return _decode(content[child.start_byte:child.end_byte])
         return None
 
-    def _get_docstring(self, node, content: str) -> Optional[str]:
-        """Extract comment block above function"""
-        # Get previous sibling(s) - could be multiple comment lines
-        comments = []
-        current = node.prev_sibling
-
-        while current and current.type == "comment":
-            comment_text = content[current.start_byte:current.end_byte]
-            comments.insert(0, comment_text)  # Insert at beginning to maintain order
-            current = current.prev_sibling
-
+    def _get_docstring(self, comments: List, content: bytes) -> Optional[str]:
+        """Join the comment block above a function (collected by _top_level)"""
         if comments:
-            return "\n".join(comments)
+            return "\n".join(_decode(content[c.start_byte:c.end_byte]) for c in comments)
         return None
 
-    def _traverse(self, node):
-        """Recursively traverse AST"""
-        yield node
-        for child in node.children:
-            yield from self._traverse(child)
+    def _top_level(self, parent):
+        """
+        Yield (declaration, comment nodes right above it) for every
+        top-level function/method declaration, in source order
+
+        Go functions and methods only exist at file scope, so there's no
+        need to visit every node - the only thing worth descending into
+        is an ERROR node, which can swallow declarations in broken files.
+        (A compiled tree-sitter Query for the two declaration types is
+        slower than this: the query cursor still visits every node in C.)
+        Comment runs are collected on the way, instead of walking back
+        through prev_sibling from each declaration.
+        """
+        comments = []
+        for node in parent.children:
+            if node.type == "comment":
+                comments.append(node)
+                continue
+
+            if node.type == "ERROR":
+                yield from self._top_level(node)
+            elif node.type in ("function_declaration", "method_declaration"):
+                yield node, comments
+            comments = []
 
 
 if __name__ == "__main__":
@@ -151,7 +172,7 @@ if __name__ == "__main__":
         sys.exit(1)
 
     file_path = sys.argv[1]
-    with open(file_path, 'r') as f:
+    with open(file_path, 'rb') as f:
         content = f.read()
 
     parser = GoParser()
@@ -0,0 +1,7 @@
+"""
+Output format shared by search_cli.py --json and the benchmark that reads it.
+Kept free of heavy imports - the benchmark driver and its workers import it.
+"""
+
+# Prefix of the machine-readable summary line printed with --json
+RESULT_JSON_PREFIX = "RESULT_JSON "
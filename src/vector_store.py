@@ -2,33 +2,75 @@
 Vector store module - manages Chroma vector database.
 """
 
+import json
+import logging
 import os
+import sqlite3
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import chromadb
+import numpy as np
 from chromadb.config import Settings
+from chromadb.errors import ChromaError
 from dataclasses import asdict
 
 from .indexer import IndexedFunction
 from .embeddings import EmbeddingGenerator
 
+# Progress is INFO, so it's silent unless the caller configures logging
+# (index_repos.py does); problems are WARNING and up, shown on stderr
+logger = logging.getLogger(__name__)
+
 
 class VectorStore:
     """Manages Chroma vector database for code search"""
 
-    def __init__(self, persist_directory: str = "./data/chroma_db", collection_name: str = "production_code"):
+    # HNSW index settings - cosine distance (what OpenAI embeddings are
+    # meant for), and a denser graph / wider search than Chroma's defaults
+    # for better recall. Only applied when a collection is created; reset()
+    # an existing store to rebuild it with these.
+    COLLECTION_METADATA = {
+        "description": "Production Go code functions",
+        "hnsw:space": "cosine",
+        "hnsw:M": 32,
+        "hnsw:construction_ef": 200,
+        "hnsw:search_ef": 64,
+    }
+
+    # Query embeddings kept in memory (LRU) - repeated queries skip the API
+    QUERY_CACHE_SIZE = 1024
+
+    # score_batch dequantizes this many stored rows at a time
+    SCORE_BLOCK = 4096
+
+    # top_k_by_score re-ranks k * RERANK_FACTOR int8 candidates exactly
+    RERANK_FACTOR = 4
+
+    # Searches filtered on a single code_type with at most this many stored
+    # functions scan that partition of the int8 matrix instead of HNSW
+    PARTITION_SCAN_MAX = 10000
+
+    def __init__(self, persist_directory: str = "./data/chroma_db", collection_name: str = "production_code",
+                 embedding_generator: Optional[EmbeddingGenerator] = None):
         """
         Initialize vector store
 
         Args:
             persist_directory: Where to store the database
             collection_name: Name of the collection
+            embedding_generator: Existing generator to embed queries with
+                (shares its OpenAI client and cache); a new one if omitted
         """
         self.persist_directory = Path(persist_directory)
         self.persist_directory.mkdir(parents=True, exist_ok=True)
 
         # Initialize embedding generator for queries
-        self.embedding_generator = EmbeddingGenerator()
+        self.embedding_generator = embedding_generator or EmbeddingGenerator()
+        self._query_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
 
         # Initialize Chroma client with persistence
         self.client = chromadb.PersistentClient(
@@ -42,57 +84,133 @@ class VectorStore:
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
             name=collection_name,
-            metadata={"description": "Production Go code functions"}
+            metadata=self.COLLECTION_METADATA
         )
 
-        print(f"📦 Vector store initialized: {collection_name}")
-        print(f"   Location: {self.persist_directory}")
-        print(f"   Existing documents: {self.collection.count()}")
-
-    def add_functions(self, functions: List[IndexedFunction], embeddings: List[List[float]]):
+        # Row-normalized, int8-quantized copy of every stored embedding for
+        # score_batch (a quarter of the float32 size), loaded on first use.
+        # Rebuilt when collection.count() moves, so rows written by another
+        # process (e.g. the indexer, while the MCP server runs) show up
+        self._matrix: Optional[np.ndarray] = None  # int8 codes (n_stored, dim)
+        self._matrix_scale: Optional[np.ndarray] = None  # float32 per-row scale (n_stored,)
+        self._matrix_ids: List[str] = []
+        self._matrix_count: Optional[int] = None  # collection.count() it was built at
+
+        # The same, per code_type, for filtered searches that scan instead of
+        # using HNSW: code_type -> (count built at, ids, codes, scales), with
+        # ids None for a partition too big to scan. Only built on a type's
+        # second filtered search - a one-off (search_cli --type) is cheaper
+        # answered by Chroma than by loading the partition first
+        self._partitions: Dict[str, Tuple] = {}
+        self._partition_requests: Counter = Counter()
+        # Held while the matrix / partition caches are checked or rebuilt,
+        # so concurrent searches (MCP request workers) build each one once
+        self._scan_lock = threading.Lock()
+
+        # Per-repo / per-type counts for get_stats, kept up to date by
+        # add_functions and saved next to the database. Only trusted while
+        # they add up to collection.count(); otherwise rebuilt by a scan
+        self._counts_path = self.persist_directory / f"{collection_name}_stats.json"
+        self._repo_counts: Counter = Counter()
+        self._type_counts: Counter = Counter()
+        self._counted: Optional[int] = None  # Functions covered by the counts
+        self._counts_lock = threading.Lock()
+        self._load_counts()
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("📦 Vector store initialized: %s", collection_name)
+            logger.info("   Location: %s", self.persist_directory)
+            logger.info("   Existing documents: %d", self.collection.count())
+
+    def add_functions(self, functions: List[IndexedFunction], embeddings: List[Optional[np.ndarray]],
+                      batch_size: int = 200, workers: int = 1):
         """
         Add functions with their embeddings to the vector store
 
         Args:
             functions: List of IndexedFunction objects
             embeddings: Corresponding embedding vectors
+            batch_size: Functions per collection.add call (Chroma ingests
+                fastest in batches of roughly 50-250; capped at the client's
+                max batch size)
+            workers: Chunks uploaded concurrently. Chroma's local backend
+                serializes SQLite writes, so this mostly overlaps the
+                client-side validation/serialization of one chunk with the
+                write of another - measure before raising it
         """
         if len(functions) != len(embeddings):
             raise ValueError(f"Mismatch: {len(functions)} functions but {len(embeddings)} embeddings")
 
-        # Filter out any None embeddings (failed API calls)
-        valid_items = [(f, e) for f, e in zip(functions, embeddings) if e is not None]
-
-        if not valid_items:
-            print("❌ No valid embeddings to add")
+        # Skip any None embeddings (failed API calls)
+        first = next((e for e in embeddings if e is not None), None)
+        if first is None:
+            logger.warning("❌ No valid embeddings to add")
             return
 
-        functions_valid, embeddings_valid = zip(*valid_items)
-
-        # Convert tuples to lists explicitly for Chroma compatibility
-        functions_valid = list(functions_valid)
-        embeddings_valid = list(embeddings_valid)
-
-        print(f"\n💾 Adding {len(functions_valid)} functions to vector store...")
-
-        # Prepare data for Chroma
-        ids = [f.id for f in functions_valid]
-        documents = [f.content for f in functions_valid]
-        metadatas = [f.metadata for f in functions_valid]
-
-        # Ensure all embeddings are lists (convert from any format)
-        embeddings_list = [list(e) for e in embeddings_valid]
-
-        # Add to collection in batch
-        self.collection.add(
-            ids=ids,
-            documents=documents,
-            embeddings=embeddings_list,
-            metadatas=metadatas
-        )
+        # Prepare data for Chroma in one pass - embeddings written straight
+        # into one contiguous float32 matrix (what Chroma stores anyway)
+        n = len(functions)
+        ids: List = [None] * n
+        documents: List = [None] * n
+        metadatas: List = [None] * n
+        embeddings_array = np.empty((n, len(first)), dtype=np.float32)
+
+        count = 0
+        for func, embedding in zip(functions, embeddings):
+            if embedding is None:
+                continue
+            ids[count] = func.id
+            documents[count] = func.content
+            metadatas[count] = func.metadata
+            embeddings_array[count] = embedding
+            count += 1
+
+        if count < n:
+            del ids[count:], documents[count:], metadatas[count:]
+            embeddings_array = embeddings_array[:count]
+
+        logger.info("\n💾 Adding %d functions to vector store...", count)
+
+        # Add to collection in fixed-size chunks
+        step = max(1, min(batch_size, self.client.get_max_batch_size()))
+
+        def add_chunk(i: int):
+            self.collection.add(
+                ids=ids[i:i + step],
+                documents=documents[i:i + step],
+                embeddings=embeddings_array[i:i + step],
+                metadatas=metadatas[i:i + step]
+            )
 
-        print(f"✅ Added {len(functions_valid)} functions")
-        print(f"   Total in store: {self.collection.count()}")
+        starts = range(0, len(ids), step)
+        try:
+            if workers > 1 and len(starts) > 1:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    # list() re-raises the first failed chunk's error
+                    list(executor.map(add_chunk, starts))
+            else:
+                for i in starts:
+                    add_chunk(i)
+        finally:
+            # Even a partial add changes the collection
+            with self._scan_lock:
+                self._matrix = None
+                self._partitions = {}
+
+        # Existing ids are skipped by add(), so only count this batch if the
+        # store grew by all of it - otherwise get_stats rescans
+        total = self.collection.count()
+        with self._counts_lock:
+            if self._counted is not None and self._counted + count == total:
+                self._repo_counts.update(meta.get('repo', 'unknown') for meta in metadatas)
+                self._type_counts.update(meta.get('code_type', 'unknown') for meta in metadatas)
+                self._counted = total
+            else:
+                self._counted = None
+            self._save_counts()
+
+        logger.info("✅ Added %d functions", count)
+        logger.info("   Total in store: %d", total)
 
     def search(self, query: str, n_results: int = 5, filter_metadata: Optional[Dict] = None) -> List[Dict]:
         """
@@ -107,73 +225,476 @@ class VectorStore:
             List of search results with content and metadata
         """
         # Generate query embedding using OpenAI (same model as indexing)
-        query_embedding = self.embedding_generator.generate_embeddings([query])[0]
-
-        if query_embedding is None:
-            raise ValueError("Failed to generate query embedding")
+        query_embedding = self._embed_queries([query])[0]
 
         # Query the collection with embedding vector
-        results = self.collection.query(
-            query_embeddings=[query_embedding],
-            n_results=n_results,
-            where=filter_metadata if filter_metadata else None
-        )
+        results = self._query([query_embedding], n_results, filter_metadata)
+
+        return self._format_results(results, 0)
+
+    def search_batch(self, queries: List[str], n_results: int = 5,
+                     filter_metadata: Optional[Dict] = None) -> List[List[Dict]]:
+        """
+        Search for several queries at once
+
+        Embeds all queries in one batched API call and runs a single Chroma
+        query for all of them, instead of one round trip each.
+
+        Args:
+            queries: Search queries (natural language or code)
+            n_results: Number of results to return per query
+            filter_metadata: Optional metadata filters applied to every query
+
+        Returns:
+            One list of search results per query (same order as queries)
+        """
+        if not queries:
+            return []
+
+        query_embeddings = self._embed_queries(queries)
+
+        results = self._query(query_embeddings, n_results, filter_metadata)
+
+        return [self._format_results(results, q) for q in range(len(queries))]
+
+    def _query(self, query_embeddings: List[np.ndarray], n_results: int,
+               filter_metadata: Optional[Dict]) -> Dict:
+        """
+        Run one Chroma query for a batch of embeddings
+
+        Embeddings go in as a single float32 matrix (no per-vector list
+        conversion in Chroma), and `where` is only passed when there's a
+        filter, so unfiltered searches skip Chroma's filter handling.
+        A filter on one small code_type partition is answered by scanning
+        that partition instead (see _scan_partition).
+        """
+        query_matrix = np.asarray(query_embeddings, dtype=np.float32)
+
+        partition = self._partition(filter_metadata)
+        if partition is not None:
+            return self._scan_partition(query_matrix, partition, n_results)
+
+        kwargs = {
+            "query_embeddings": query_matrix,
+            "n_results": n_results,
+        }
+        if filter_metadata:
+            kwargs["where"] = filter_metadata
+
+        return self.collection.query(**kwargs)
+
+    def _embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """
+        Embed queries, serving repeats from the in-memory LRU cache
+
+        Misses are embedded in one API call. Failures aren't cached.
+
+        Raises:
+            ValueError: If any query embedding failed
+        """
+        with self._query_cache_lock:
+            embeddings = [self._query_cache.get(q) for q in queries]
+            for q, e in zip(queries, embeddings):
+                if e is not None:
+                    self._query_cache.move_to_end(q)
+
+        misses = list(dict.fromkeys(q for q, e in zip(queries, embeddings) if e is None))
+        if misses:
+            fresh = dict(zip(misses, self.embedding_generator.generate_embeddings(misses)))
+            if any(e is None for e in fresh.values()):
+                raise ValueError("Failed to generate query embedding")
+
+            with self._query_cache_lock:
+                for q, e in fresh.items():
+                    e.setflags(write=False)  # Shared by every later hit
+                    self._query_cache[q] = e
+                while len(self._query_cache) > self.QUERY_CACHE_SIZE:
+                    self._query_cache.popitem(last=False)
+
+            embeddings = [e if e is not None else fresh[q] for q, e in zip(queries, embeddings)]
+
+        return embeddings
+
+    def _partition(self, filter_metadata: Optional[Dict]) -> Optional[Tuple[List[str], np.ndarray, np.ndarray]]:
+        """
+        (ids, codes, scales) of the functions matching a filter on exactly
+        one code_type, if there are few enough to scan (cached per type)
+
+        The partition is sized first (from the get_stats counts when they're
+        current, else by listing its ids), so embeddings are only fetched
+        for partitions that will actually be scanned.
+        """
+        if not filter_metadata or len(filter_metadata) != 1:
+            return None
+        code_type = filter_metadata.get("code_type")
+        if not isinstance(code_type, str):
+            return None
+
+        count = self.collection.count()
+        with self._scan_lock:
+            cached = self._partitions.get(code_type)
+            if cached is None or cached[0] != count:
+                self._partition_requests[code_type] += 1
+                if self._partition_requests[code_type] < 2:
+                    return None
+
+                cached = self._build_partition(code_type, count)
+                if cached is None:
+                    return None
+                self._partitions[code_type] = cached
+
+        _, ids, codes, scales = cached
+        return None if ids is None else (ids, codes, scales)
+
+    def _build_partition(self, code_type: str, count: int) -> Optional[Tuple]:
+        """
+        Load one code_type partition for _partition (called under _scan_lock)
+
+        Returns:
+            (count, ids, codes, scales), ids None if it's too big to scan;
+            None if Chroma couldn't return every member (not cached, so a
+            later search retries)
+        """
+        with self._counts_lock:
+            known_size = self._type_counts.get(code_type, 0) if self._counted == count else None
+        if known_size is not None and known_size > self.PARTITION_SCAN_MAX:
+            return (count, None, None, None)
+
+        member_ids = self.collection.get(where={"code_type": code_type}, include=[])['ids']
+        if len(member_ids) > self.PARTITION_SCAN_MAX:
+            return (count, None, None, None)
+        if not member_ids:
+            return (count, [], np.zeros((0, 0), dtype=np.int8), np.zeros(0, dtype=np.float32))
+
+        ids, codes, scales = [], [], []
+        page = 5000
+        try:
+            for offset in range(0, len(member_ids), page):
+                page_ids = member_ids[offset:offset + page]
+                chunk = self.collection.get(ids=page_ids, include=["embeddings"])
+                if len(chunk['ids']) != len(page_ids):
+                    logger.warning("⚠️  Could not load code_type=%s for scanning: got %d of %d functions",
+                                   code_type, len(chunk['ids']), len(page_ids))
+                    return None
+                ids.extend(chunk['ids'])
+                page_codes, page_scales = _quantize_int8(chunk['embeddings'], normalize=True)
+                codes.append(page_codes)
+                scales.append(page_scales)
+        except ChromaError as e:
+            # Rows another process added can be listed before this client's
+            # vector segment has them - leave it to Chroma
+            logger.warning("⚠️  Could not load code_type=%s for scanning: %s", code_type, e)
+            return None
+
+        return (count, ids, np.concatenate(codes), np.concatenate(scales))
+
+    def _scan_partition(self, query_matrix: np.ndarray,
+                        partition: Tuple[List[str], np.ndarray, np.ndarray], n_results: int) -> Dict:
+        """
+        Brute-force search over one int8 partition (see _partition)
+
+        HNSW with a `where` filter walks the whole graph and throws away
+        every candidate of another type; for a small partition, scoring
+        its rows directly is cheaper and exact after the float32 re-rank
+        (same as top_k_by_score).
 
-        # Format results
+        Returns:
+            Chroma query()-shaped results (cosine distances), one entry
+            per query row
+        """
+        ids, codes, scales = partition
+        results = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        n_candidates = min(n_results * self.RERANK_FACTOR, len(ids))
+        if n_results <= 0 or n_candidates <= 0:
+            for key in results:
+                results[key] = [[] for _ in range(len(query_matrix))]
+            return results
+
+        q = _normalize_rows(query_matrix)
+        scores = self._score_codes(q, codes, scales)
+        candidates = np.argpartition(scores, -n_candidates, axis=1)[:, -n_candidates:]
+
+        # One get() for every query's candidates, then re-rank exactly
+        candidate_ids = list(dict.fromkeys(ids[i] for i in candidates.ravel()))
+        stored = self.collection.get(ids=candidate_ids, include=["embeddings", "documents", "metadatas"])
+        position = {id_: j for j, id_ in enumerate(stored['ids'])}
+        exact = _normalize_rows(stored['embeddings']) @ q.T  # (n_fetched, n_queries)
+
+        for qi in range(len(q)):
+            cols = [position[ids[i]] for i in candidates[qi] if ids[i] in position]
+            sims = exact[cols, qi]
+            best = [cols[i] for i in np.argsort(sims)[::-1][:n_results]]
+
+            results["ids"].append([stored['ids'][j] for j in best])
+            results["documents"].append([stored['documents'][j] for j in best])
+            results["metadatas"].append([stored['metadatas'][j] for j in best])
+            results["distances"].append([1.0 - float(exact[j, qi]) for j in best])
+
+        return results
+
+    def _format_results(self, results: Dict, q: int) -> List[Dict]:
+        """Format the Chroma results for the q-th query embedding"""
         formatted_results = []
-        if results['ids'] and results['ids'][0]:
-            for i in range(len(results['ids'][0])):
+        if results['ids'] and results['ids'][q]:
+            for i in range(len(results['ids'][q])):
                 formatted_results.append({
-                    "id": results['ids'][0][i],
-                    "content": results['documents'][0][i],
-                    "metadata": results['metadatas'][0][i],
-                    "distance": results['distances'][0][i] if 'distances' in results else None
+                    "id": results['ids'][q][i],
+                    "content": results['documents'][q][i],
+                    "metadata": results['metadatas'][q][i],
+                    "distance": results['distances'][q][i] if 'distances' in results else None
                 })
 
         return formatted_results
 
+    def _embedding_matrix(self) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        All stored embeddings, L2-normalized and int8-quantized (cached)
+
+        Returns:
+            (ids, codes, scales): function ids, int8 (n_stored, dim) and
+            float32 (n_stored,); row i is approximately codes[i] * scales[i]
+        """
+        count = self.collection.count()
+        with self._scan_lock:
+            if self._matrix is None or self._matrix_count != count:
+                self._load_matrix(count)
+            if self._matrix is None:
+                return [], np.zeros((0, 0), dtype=np.int8), np.zeros(0, dtype=np.float32)
+            return self._matrix_ids, self._matrix, self._matrix_scale
+
+    def _load_matrix(self, count: int):
+        """Rebuild the _embedding_matrix cache (called under _scan_lock)"""
+        # Quantized a page at a time, so the full float32 matrix never exists
+        ids, codes, scales = [], [], []
+        page = 5000
+        for offset in range(0, count, page):
+            chunk = self.collection.get(include=["embeddings"], limit=page, offset=offset)
+            if not chunk['ids']:
+                continue
+            ids.extend(chunk['ids'])
+            page_codes, page_scales = _quantize_int8(chunk['embeddings'], normalize=True)
+            codes.append(page_codes)
+            scales.append(page_scales)
+
+        if not ids:
+            self._matrix = None
+            return
+
+        self._matrix, self._matrix_scale = np.concatenate(codes), np.concatenate(scales)
+        self._matrix_ids = ids
+        self._matrix_count = count
+
+    def score_batch(self, query_vec: np.ndarray) -> np.ndarray:
+        """
+        Cosine similarity of query vector(s) against every stored embedding
+
+        Brute-force over the whole collection, e.g. for near-duplicate
+        checks or validating the ANN index. Scores come from the int8 copy
+        of the stored embeddings (within ~1e-3 of exact for 1536-d vectors);
+        top_k_by_score gives exact scores for the best matches.
+
+        Args:
+            query_vec: One query embedding (dim,) or a batch (n_queries, dim)
+
+        Returns:
+            Scores (n_stored,) or (n_queries, n_stored); column i is the
+            function with id self._matrix_ids[i] (at the time of the call)
+        """
+        _, codes, scales = self._embedding_matrix()
+        return self._score_codes(_normalize_rows(query_vec), codes, scales)
+
+    def _score_codes(self, q: np.ndarray, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Dot products of normalized query vector(s) with int8 rows (codes * scales)"""
+        n = codes.shape[0]
+
+        scores = np.empty(q.shape[:-1] + (n,), dtype=np.float32)
+        if n == 0:
+            return scores
+
+        # Dequantize a block at a time into one reused float32 buffer, so
+        # the product still runs through BLAS
+        block = np.empty((min(self.SCORE_BLOCK, n), codes.shape[1]), dtype=np.float32)
+        for i in range(0, n, self.SCORE_BLOCK):
+            rows = block[:min(self.SCORE_BLOCK, n - i)]
+            np.copyto(rows, codes[i:i + self.SCORE_BLOCK], casting="unsafe")
+            scores[..., i:i + rows.shape[0]] = (q @ rows.T) * scales[i:i + rows.shape[0]]
+        return scores
+
+    def top_k_by_score(self, query_vec: np.ndarray, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Exact top-K stored functions for one query embedding
+
+        Candidates (k * RERANK_FACTOR) come from the int8 scores; their
+        float32 embeddings are then fetched and re-ranked exactly.
+
+        Returns:
+            (function id, cosine similarity) pairs, best first
+        """
+        # ids taken with the codes, in case another thread rebuilds the cache
+        ids, codes, scales = self._embedding_matrix()
+        scores = self._score_codes(_normalize_rows(query_vec), codes, scales)
+        n_candidates = min(k * self.RERANK_FACTOR, scores.shape[0])
+        if k <= 0 or n_candidates <= 0:
+            return []
+
+        candidates = np.argpartition(scores, -n_candidates)[-n_candidates:]
+        candidate_ids = [ids[i] for i in candidates]
+
+        # Re-rank on the stored float32 vectors
+        stored = self.collection.get(ids=candidate_ids, include=["embeddings"])
+        exact = _normalize_rows(stored['embeddings']) @ _normalize_rows(query_vec)
+
+        best = np.argsort(exact)[::-1][:k]
+        return [(stored['ids'][i], float(exact[i])) for i in best]
+
     def get_stats(self) -> Dict:
         """Get statistics about the vector store"""
         count = self.collection.count()
 
-        # Get all metadata to compute stats
-        if count > 0:
-            sample = self.collection.get(limit=count)
-            metadatas = sample['metadatas']
+        with self._counts_lock:
+            if self._counted != count:
+                # Counts missing or stale (e.g. written by another process):
+                # page through the metadata only (no documents or embeddings)
+                repos = Counter()
+                types = Counter()
 
-            repos = {}
-            types = {}
+                page = 10000
+                for offset in range(0, count, page):
+                    chunk = self.collection.get(include=["metadatas"], limit=page, offset=offset)
+                    metadatas = chunk['metadatas']
 
-            for meta in metadatas:
-                repo = meta.get('repo', 'unknown')
-                code_type = meta.get('code_type', 'unknown')
+                    # Counter.update counts an iterable in C
+                    repos.update(meta.get('repo', 'unknown') for meta in metadatas)
+                    types.update(meta.get('code_type', 'unknown') for meta in metadatas)
 
-                repos[repo] = repos.get(repo, 0) + 1
-                types[code_type] = types.get(code_type, 0) + 1
+                self._repo_counts, self._type_counts, self._counted = repos, types, count
+                self._save_counts()
 
             return {
                 "total_functions": count,
-                "repos": repos,
-                "types": types
+                "repos": dict(self._repo_counts),
+                "types": dict(self._type_counts)
             }
-        else:
-            return {"total_functions": 0, "repos": {}, "types": {}}
 
-    def reset(self):
-        """Delete all data in the collection (use with caution!)"""
-        print(f"⚠️  Resetting collection...")
+    def _load_counts(self):
+        """Load the counts saved by a previous run (ignored if unreadable)"""
+        try:
+            with open(self._counts_path) as f:
+                saved = json.load(f)
+            self._repo_counts = Counter(saved["repos"])
+            self._type_counts = Counter(saved["types"])
+            self._counted = saved["total_functions"]
+        except (OSError, ValueError, KeyError, TypeError):
+            # Nothing to count yet in an empty collection
+            self._repo_counts, self._type_counts = Counter(), Counter()
+            self._counted = 0 if self.collection.count() == 0 else None
+
+    def _save_counts(self):
+        """Save the counts (or drop the file if they're stale)"""
+        try:
+            if self._counted is None:
+                self._counts_path.unlink(missing_ok=True)
+                return
+
+            tmp_path = self._counts_path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "total_functions": self._counted,
+                    "repos": self._repo_counts,
+                    "types": self._type_counts
+                }, f)
+            os.replace(tmp_path, self._counts_path)
+        except OSError as e:
+            logger.warning("⚠️  Could not save stats to %s: %s", self._counts_path, e)
+
+    def reset(self, vacuum: bool = True):
+        """
+        Delete all data in the collection (use with caution!)
+
+        Only this collection is dropped and recreated (client.reset() would
+        wipe every collection in the persist directory). The embedding
+        generator, its caches and the query cache are kept - they depend on
+        the model, not on what's stored.
+
+        Args:
+            vacuum: VACUUM Chroma's SQLite file afterwards, so the deleted
+                rows' pages go back to the filesystem instead of bloating it
+        """
+        logger.info("⚠️  Resetting collection...")
         self.client.delete_collection(self.collection.name)
         self.collection = self.client.get_or_create_collection(
             name=self.collection.name,
-            metadata={"description": "Production Go code functions"}
+            metadata=self.COLLECTION_METADATA
         )
-        print("✅ Collection reset")
+        with self._scan_lock:
+            self._matrix = None
+            self._partitions = {}
+        with self._counts_lock:
+            self._repo_counts, self._type_counts, self._counted = Counter(), Counter(), 0
+            self._save_counts()
+
+        if vacuum:
+            self._vacuum()
+        logger.info("✅ Collection reset")
+
+    def _vacuum(self):
+        """Compact Chroma's SQLite file (best effort - skipped if busy)"""
+        db_path = self.persist_directory / "chroma.sqlite3"
+        if not db_path.exists():
+            return
+
+        try:
+            conn = sqlite3.connect(str(db_path), timeout=5)
+            try:
+                conn.execute("VACUUM")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning("⚠️  Could not vacuum %s: %s", db_path, e)
+
+
+def _normalize_rows(vectors) -> np.ndarray:
+    """float32 copy of vector(s) scaled to unit L2 norm (zero vectors stay zero)"""
+    v = np.array(vectors, dtype=np.float32)
+    norms = np.linalg.norm(v, axis=-1, keepdims=True)
+    v /= np.where(norms == 0, 1, norms)
+    return v
+
+
+def _quantize_int8(matrix, normalize: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Symmetric per-row int8 quantization
+
+    Args:
+        matrix: (n, dim) vectors
+        normalize: Quantize the rows as if L2-normalized first. The codes
+            don't depend on a row's length, only its scale does, so this
+            costs one norm per row instead of a normalized float32 copy
+
+    Returns:
+        (codes, scales) with matrix[i] ~= codes[i] * scales[i]
+        (matrix[i] / |matrix[i]| with normalize=True)
+    """
+    m = np.asarray(matrix, dtype=np.float32)
+    peaks = np.abs(m).max(axis=1)
+    safe = np.where(peaks == 0, 1, peaks)
+
+    scaled = m * (127 / safe)[:, None]
+    np.rint(scaled, out=scaled)
+    codes = scaled.astype(np.int8)
+
+    scales = peaks / 127
+    if normalize:
+        norms = np.linalg.norm(m, axis=1)
+        scales /= np.where(norms == 0, 1, norms)
+    return codes, scales.astype(np.float32)
 
 
 if __name__ == "__main__":
     # Test vector store
     from dotenv import load_dotenv
     load_dotenv()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     store = VectorStore()
     stats = store.get_stats()
@@ -23,8 +23,8 @@ print(f"\n📊 Embedding Analysis:")
 print(f"   Type of embeddings: {type(embeddings)}")
 print(f"   Number of embeddings: {len(embeddings)}")
 print(f"   Type of first embedding: {type(embeddings[0])}")
-print(f"   Length of first embedding: {len(embeddings[0]) if embeddings[0] else 'None'}")
-print(f"   Sample: {embeddings[0][:5] if embeddings[0] else 'None'}")
+print(f"   Length of first embedding: {len(embeddings[0]) if embeddings[0] is not None else 'None'}")
+print(f"   Sample: {embeddings[0][:5] if embeddings[0] is not None else 'None'}")
 
 # Now test with vector store
 print("\n\nTesting with VectorStore...")
@@ -39,7 +39,8 @@ functions = [
     for i in range(len(texts))
 ]
 
-store = VectorStore(persist_directory="./data/test_chroma")
+# Reuse the generator above rather than opening a second client
+store = VectorStore(persist_directory="./data/test_chroma", embedding_generator=generator)
 store.reset()  # Clear any existing data
 
 try:
@@ -2,15 +2,20 @@
 """
 Simple MCP server test script
 Sends JSON-RPC requests to test the server
+
+Usage:
+    python test_mcp_server.py          # In-process (fast: MCPServer.handle_request)
+    python test_mcp_server.py --stdio  # Spawn ./run_mcp_server.sh (tests stdio framing too)
 """
 
 import subprocess
 import json
+import os
 import sys
 
 
-def send_request(proc, method, params=None, request_id=1):
-    """Send JSON-RPC request and get response"""
+def make_request(method, params=None, request_id=1):
+    """Build a JSON-RPC request"""
     request = {
         "jsonrpc": "2.0",
         "id": request_id,
@@ -18,38 +23,82 @@ def send_request(proc, method, params=None, request_id=1):
     }
     if params:
         request["params"] = params
+    return request
+
+
+class InProcessClient:
+    """Calls MCPServer.handle_request directly - no subprocess, imports loaded once"""
+
+    def __init__(self):
+        from dotenv import load_dotenv
+        load_dotenv()
+
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        from src.mcp_server import MCPServer
+
+        self.server = MCPServer()
+
+    def send_request(self, method, params=None, request_id=1):
+        """Send JSON-RPC request and get response"""
+        # Round-trip through JSON so responses look exactly as on the wire
+        return json.loads(json.dumps(self.server.handle_request(make_request(method, params, request_id))))
+
+    def stderr(self):
+        return ""  # Server logs already went to our stderr
+
+    def close(self):
+        pass
+
+
+class StdioClient:
+    """Talks to ./run_mcp_server.sh over stdin/stdout, like a real MCP client"""
+
+    def __init__(self):
+        self.proc = subprocess.Popen(
+            ["./run_mcp_server.sh"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+    def send_request(self, method, params=None, request_id=1):
+        """Send JSON-RPC request and get response"""
+        # Send request
+        request_json = json.dumps(make_request(method, params, request_id)) + "\n"
+        self.proc.stdin.write(request_json)
+        self.proc.stdin.flush()
+
+        # Read response
+        response_line = self.proc.stdout.readline()
+        if not response_line:
+            raise Exception("No response from server")
+
+        return json.loads(response_line)
 
-    # Send request
-    request_json = json.dumps(request) + "\n"
-    proc.stdin.write(request_json)
-    proc.stdin.flush()
+    def stderr(self):
+        return self.proc.stderr.read()
 
-    # Read response
-    response_line = proc.stdout.readline()
-    if not response_line:
-        raise Exception("No response from server")
+    def close(self):
+        self.proc.terminate()
+        self.proc.wait()
 
-    return json.loads(response_line)
 
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    stdio = "--stdio" in argv
 
-def main():
-    print("🧪 Testing MCP Server")
+    print(f"🧪 Testing MCP Server ({'stdio subprocess' if stdio else 'in-process'})")
     print("=" * 60)
 
     # Start server
-    proc = subprocess.Popen(
-        ["./run_mcp_server.sh"],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        bufsize=1
-    )
+    client = StdioClient() if stdio else InProcessClient()
 
     try:
         # Test 1: Initialize
         print("\n[Test 1] Initialize")
-        response = send_request(proc, "initialize", {
+        response = client.send_request("initialize", {
             "protocolVersion": "2024-11-05",
             "capabilities": {},
             "clientInfo": {"name": "test-client", "version": "1.0.0"}
@@ -58,7 +107,7 @@ def main():
 
         # Test 2: List tools
         print("\n[Test 2] List tools")
-        response = send_request(proc, "tools/list", request_id=2)
+        response = client.send_request("tools/list", request_id=2)
         tools = response['result']['tools']
         print(f"✅ Found {len(tools)} tools:")
         for tool in tools:
@@ -66,7 +115,7 @@ def main():
 
         # Test 3: Search code
         print("\n[Test 3] Search code for 'JWT authentication'")
-        response = send_request(proc, "tools/call", {
+        response = client.send_request("tools/call", {
             "name": "search_code",
             "arguments": {
                 "query": "JWT authentication",
@@ -82,7 +131,7 @@ def main():
 
         # Test 4: Get stats
         print("\n[Test 4] Get stats")
-        response = send_request(proc, "tools/call", {
+        response = client.send_request("tools/call", {
             "name": "get_stats",
             "arguments": {}
         }, request_id=4)
@@ -93,7 +142,7 @@ def main():
 
         # Test 5: List resources
         print("\n[Test 5] List resources")
-        response = send_request(proc, "resources/list", request_id=5)
+        response = client.send_request("resources/list", request_id=5)
         resources = response['result']['resources']
         print(f"✅ Found {len(resources)} resources:")
         for r in resources[:3]:  # Show first 3
@@ -106,14 +155,13 @@ def main():
     except Exception as e:
         print(f"\n❌ Test failed: {e}")
         # Print server stderr
-        stderr = proc.stderr.read()
+        stderr = client.stderr()
         if stderr:
             print(f"\nServer stderr:\n{stderr}")
         return 1
 
     finally:
-        proc.terminate()
-        proc.wait()
+        client.close()
 
 
 if __name__ == "__main__":
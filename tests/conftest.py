@@ -0,0 +1,93 @@
+"""
+Shared fixtures - one embedding generator, vector store and MCP server per
+test session, backed by a fake OpenAI client (no network, no API key)
+"""
+
+import base64
+import hashlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.embeddings import EmbeddingGenerator
+from src.indexer import IndexedFunction
+from src.mcp_server import MCPServer
+from src.vector_store import VectorStore
+
+DIM = 16
+
+SAMPLE_FUNCTIONS = [
+    ("auth", "middleware/jwt.go", "JWTMiddleware", "middleware",
+     "func JWTMiddleware(next http.Handler) http.Handler { /* validate JWT */ }"),
+    ("auth", "handlers/login.go", "Login", "handler",
+     "func Login(w http.ResponseWriter, r *http.Request) { /* issue token */ }"),
+    ("billing", "handlers/invoice.go", "GetInvoice", "handler",
+     "func GetInvoice(w http.ResponseWriter, r *http.Request) { /* load invoice */ }"),
+    ("billing", "repository/invoice.go", "FindInvoice", "repository",
+     "func FindInvoice(ctx context.Context, id string) (*Invoice, error) { /* SELECT */ }"),
+    ("billing", "service/retry.go", "WithRetry", "service",
+     "func WithRetry(fn func() error, attempts int) error { /* backoff */ }"),
+    ("gateway", "middleware/logging.go", "RequestLogger", "middleware",
+     "func RequestLogger(next http.Handler) http.Handler { /* log request */ }"),
+]
+
+
+def fake_embedding(text: str) -> np.ndarray:
+    """Deterministic pseudo-embedding for a text"""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(DIM).astype("<f4")
+
+
+class FakeOpenAI:
+    """Stands in for openai.OpenAI - only embeddings.create(encoding_format="base64")"""
+
+    def __init__(self):
+        self.embeddings = SimpleNamespace(create=self._create)
+
+    @staticmethod
+    def _create(model, input, encoding_format="base64"):
+        return SimpleNamespace(data=[
+            SimpleNamespace(embedding=base64.b64encode(fake_embedding(text).tobytes()).decode())
+            for text in input
+        ])
+
+
+@pytest.fixture(scope="session")
+def embedder(tmp_path_factory):
+    """EmbeddingGenerator with a fake client and a real SQLite cache"""
+    cache_path = tmp_path_factory.mktemp("embeddings") / "cache.db"
+    generator = EmbeddingGenerator(api_key="test", cache_path=str(cache_path))
+    generator.client = FakeOpenAI()
+    return generator
+
+
+@pytest.fixture(scope="session")
+def store(tmp_path_factory, embedder):
+    """Vector store holding SAMPLE_FUNCTIONS"""
+    store = VectorStore(persist_directory=str(tmp_path_factory.mktemp("chroma")),
+                        embedding_generator=embedder)
+
+    functions = [
+        IndexedFunction(
+            id=f"{repo}/{file}:{name}",
+            content=code,
+            metadata={
+                "repo": repo, "file": file, "function": name,
+                "start_line": 1, "end_line": 1, "lines_of_code": 1,
+                "has_docstring": False, "is_method": False, "receiver": "",
+                "code_type": code_type,
+            }
+        )
+        for repo, file, name, code_type, code in SAMPLE_FUNCTIONS
+    ]
+    store.add_functions(functions, embedder.generate_embeddings([f.content for f in functions]))
+    return store
+
+
+@pytest.fixture(scope="session")
+def server(store):
+    """MCP server using the session's store"""
+    server = MCPServer()
+    server._vector_store = store
+    return server
@@ -0,0 +1,15 @@
+"""benchmark/benchmark.py stays light to import (it runs in every timed worker)"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_benchmark_import_skips_vector_store():
+    probe = ("import sys, benchmark; "
+             "print(sorted(m for m in ('chromadb', 'openai', 'search_cli') if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", probe], cwd=ROOT / "benchmark",
+                         capture_output=True, text=True, check=True).stdout
+    assert out.strip() == "[]"
@@ -0,0 +1,45 @@
+"""Embedding generation and the vector store (fake embeddings)"""
+
+import numpy as np
+
+from src.embeddings import EmbeddingGenerator
+
+from .conftest import DIM, SAMPLE_FUNCTIONS, FakeOpenAI, fake_embedding
+
+
+def test_embedding_format(embedder):
+    texts = ["func TestOne() { }", "func TestTwo() { }", "func TestThree() { }"]
+    embeddings = embedder.generate_embeddings(texts)
+
+    assert len(embeddings) == len(texts)
+    for text, embedding in zip(texts, embeddings):
+        assert isinstance(embedding, np.ndarray)
+        assert embedding.dtype == np.float32 and embedding.shape == (DIM,)
+        np.testing.assert_array_equal(embedding, fake_embedding(text))
+
+
+def test_embedding_cache_hits(embedder):
+    texts = ["func Cached() { }"]
+    first = embedder.generate_embeddings(texts)
+
+    # A second call is served from SQLite, bit for bit what the API returned
+    assert embedder.cache.get_many(embedder.model, texts)[0] is not None
+    np.testing.assert_array_equal(embedder.generate_embeddings(texts)[0], first[0])
+
+
+def test_float16_cache_rounds_fresh_vectors(tmp_path):
+    generator = EmbeddingGenerator(api_key="test", cache_path=str(tmp_path / "cache.db"),
+                                   cache_dtype="float16")
+    generator.client = FakeOpenAI()
+    texts = ["func Half() { }"]
+
+    fresh = generator.generate_embeddings(texts)[0]
+    cached = generator.generate_embeddings(texts)[0]
+    assert fresh.dtype == cached.dtype == np.float32
+    np.testing.assert_array_equal(fresh, cached)  # Same vectors with or without the cache
+    np.testing.assert_allclose(fresh, fake_embedding(texts[0]), rtol=1e-3)
+
+
+def test_store_shares_generator(store, embedder):
+    assert store.embedding_generator is embedder
+    assert store.collection.count() == len(SAMPLE_FUNCTIONS)
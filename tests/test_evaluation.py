@@ -0,0 +1,93 @@
+"""evaluation-framework.py retrieval scoring against the session store"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from .conftest import SAMPLE_FUNCTIONS
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def evaluation():
+    """evaluation-framework.py loaded as a module (its file name isn't importable)"""
+    spec = importlib.util.spec_from_file_location("evaluation_framework",
+                                                  ROOT / "evaluation-framework.py")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # Numba's on-disk cache looks the module up
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def test_queries(evaluation):
+    return [
+        evaluation.TestQuery(id=i, query=code, relevant_files=[file],
+                             category=code_type, difficulty="easy")
+        for i, (_repo, file, _name, code_type, code) in enumerate(SAMPLE_FUNCTIONS)
+    ]
+
+
+def test_vector_store_rag_batches_queries(evaluation, store, test_queries, monkeypatch):
+    calls = []
+    search_batch = store.search_batch
+
+    def counting_search_batch(queries, **kwargs):
+        calls.append(len(queries))
+        return search_batch(queries, **kwargs)
+
+    monkeypatch.setattr(store, "search_batch", counting_search_batch)
+    rag = evaluation.VectorStoreRAG(store)
+
+    keys, batched = evaluation.RAGEvaluator(test_queries).score_retrieval(rag, k_values=[1, 3])
+    assert calls == [len(test_queries)]  # One search for the whole test set
+
+    class PerQuery:
+        retrieve = staticmethod(rag.retrieve)
+
+    _, per_query = evaluation.RAGEvaluator(test_queries).score_retrieval(PerQuery(), k_values=[1, 3])
+    np.testing.assert_allclose(batched, per_query)
+
+    # Each query is its function's own code, so it ranks first
+    recall_at_1 = batched[keys.index(("recall", 1))]
+    assert recall_at_1.tolist() == [1.0] * len(test_queries)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_metric_kernels_agree(evaluation, seed):
+    """Numba loop, NumPy kernel and QueryMetrics give the same scores"""
+    rng = np.random.default_rng(seed)
+    retrieved = rng.integers(0, 12, size=rng.integers(0, 15))  # Repeats included
+    relevant = np.unique(rng.integers(0, 12, size=rng.integers(0, 5)))
+    k_values = np.array([0, 1, 3, 5, 20], dtype=np.int64)
+
+    loop = evaluation._recall_precision_mrr_loop(retrieved.astype(np.int64), relevant.astype(np.int64), k_values)
+    vectorized = evaluation._recall_precision_mrr_vectorized(retrieved, relevant, k_values)
+    np.testing.assert_allclose(loop, vectorized)
+
+    metrics = evaluation.QueryMetrics(relevant=relevant.tolist())
+    docs = retrieved.tolist()
+    expected = [value for k in k_values.tolist()
+                for value in (metrics.recall_at_k(docs, k), metrics.precision_at_k(docs, k))]
+    expected.append(metrics.mean_reciprocal_rank(docs))
+    np.testing.assert_allclose(loop, expected)
+
+
+def test_ndcg_binary_relevance(evaluation):
+    metrics = evaluation.QueryMetrics(relevant=["a.go", "b.go"])
+
+    assert metrics.ndcg_at_k(["a.go", "b.go", "x.go"], 3) == pytest.approx(1.0)
+    assert metrics.ndcg_at_k(["x.go", "y.go"], 2) == 0.0
+
+    # One hit at rank 2 out of two relevant docs: (1/log2 3) / (1 + 1/log2 3)
+    discount = 1 / np.log2(3)
+    assert metrics.ndcg_at_k(["x.go", "a.go"], 2) == pytest.approx(discount / (1 + discount))
+
+    # A doc retrieved twice (two chunks of one file) only counts once
+    assert metrics.ndcg_at_k(["a.go", "a.go"], 2) == pytest.approx(1 / (1 + discount))
+    assert evaluation.RetrievalMetrics.ndcg_at_k(["a.go", "a.go"], ["a.go", "b.go"], 2) == \
+        pytest.approx(metrics.ndcg_at_k(["a.go", "a.go"], 2))
@@ -0,0 +1,112 @@
+"""CodeIndexer over a small on-disk repo (file filters, duplicates, parse cache)"""
+
+import os
+
+import pytest
+
+from src.indexer import CodeIndexer, iter_function_batches
+
+GET_USER = """package handlers
+
+// GetUser loads a user
+func GetUser(id string) string {
+	return id
+}
+"""
+
+HELPERS = """package util
+
+func Clamp(v, lo, hi int) int {
+	if v < lo {
+		return lo
+	}
+	if v > hi {
+		return hi
+	}
+	return v
+}
+"""
+
+
+@pytest.fixture
+def repos(tmp_path):
+    """Two repos - billing carries a byte-identical copy of auth's helper"""
+    files = {
+        "auth/handlers/user.go": GET_USER,
+        "auth/util/clamp.go": HELPERS,
+        "auth/handlers/user_test.go": GET_USER,
+        "auth/vendor/lib/clamp.go": HELPERS,
+        "billing/util/clamp.go": HELPERS,
+    }
+    for rel, code in files.items():
+        path = tmp_path / "repos" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(code)
+    return tmp_path / "repos"
+
+
+def index(repos, **kwargs):
+    indexer = CodeIndexer(str(repos), workers=1, **kwargs)
+    return indexer, {f.id: f for f in indexer.index_all_repos()}
+
+
+def test_production_files_only(repos):
+    indexer, functions = index(repos)
+
+    assert set(functions) == {"auth/handlers/user.go:GetUser", "auth/util/clamp.go:Clamp",
+                              "billing/util/clamp.go:Clamp"}
+    assert functions["auth/handlers/user.go:GetUser"].metadata["code_type"] == "handler"
+    assert indexer.stats["skipped_tests"] == 1
+
+    # vendor/ is pruned, not walked - counted as a directory, not its files
+    assert indexer.stats["pruned_dirs"] == 1
+    assert indexer.stats["total_files"] == 4 and indexer.stats["skipped_vendor"] == 0
+
+
+def test_duplicates_point_at_first_copy(repos):
+    indexer, functions = index(repos)
+
+    assert functions["billing/util/clamp.go:Clamp"].metadata["duplicate_of"] == "auth/util/clamp.go:Clamp"
+    assert "duplicate_of" not in functions["auth/util/clamp.go:Clamp"].metadata
+    assert indexer.stats["duplicate_functions"] == 1
+
+
+def test_parse_cache_serves_unchanged_files(repos, tmp_path):
+    cache_path = str(tmp_path / "parse_cache.pkl")
+    _, first = index(repos, cache_path=cache_path)
+
+    indexer, second = index(repos, cache_path=cache_path)
+    assert indexer.stats["cached_files"] == indexer.stats["indexed_files"] == 3
+    assert {id_: f.metadata for id_, f in second.items()} == {id_: f.metadata for id_, f in first.items()}
+
+    # A changed file is parsed again, the rest still come from the cache
+    changed = repos / "auth/handlers/user.go"
+    changed.write_text(GET_USER.replace("GetUser", "LoadUser"))
+    os.utime(changed, ns=(0, os.stat(changed).st_mtime_ns + 1_000_000))
+
+    indexer, third = index(repos, cache_path=cache_path)
+    assert indexer.stats["cached_files"] == 2
+    assert "auth/handlers/user.go:LoadUser" in third
+    assert "auth/handlers/user.go:GetUser" not in third
+
+
+def test_parse_pool_matches_in_process(repos):
+    """The (spawned) parse pool yields the same functions, in the same order"""
+    _, in_process = index(repos)
+    pooled = list(CodeIndexer(str(repos), workers=2).iter_indexed_functions())
+
+    assert [(f.id, f.metadata) for f in pooled] == [(f.id, f.metadata) for f in in_process.values()]
+
+
+def test_parquet_export_round_trip(repos, tmp_path):
+    pytest.importorskip("pyarrow")
+
+    indexer = CodeIndexer(str(repos), workers=1)
+    path = tmp_path / "functions.parquet"
+    indexer.save_functions(indexer.iter_indexed_functions(), str(path), row_group_size=2)
+    _, expected = index(repos)
+
+    batches = list(iter_function_batches(str(path), batch_size=2))
+    assert [len(b) for b in batches] == [2, 1]
+    assert [(f.id, f.content, f.metadata) for b in batches for f in b] == \
+        [(f.id, f.content, f.metadata) for f in expected.values()]
@@ -0,0 +1,117 @@
+"""MCP server request handling (in-process, fake embeddings)"""
+
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .conftest import SAMPLE_FUNCTIONS
+
+
+def make_request(method, params=None, request_id=1):
+    """Build a JSON-RPC request"""
+    request = {"jsonrpc": "2.0", "id": request_id, "method": method}
+    if params:
+        request["params"] = params
+    return request
+
+
+def search_request(request_id, query, **arguments):
+    return make_request("tools/call", {
+        "name": "search_code",
+        "arguments": {"query": query, **arguments}
+    }, request_id)
+
+
+def tool_result(response):
+    """Decode the JSON text content of a tools/call response"""
+    assert "error" not in response, response["error"]
+    return json.loads(response["result"]["content"][0]["text"])
+
+
+def test_initialize(server):
+    response = server.handle_request(make_request("initialize", {
+        "protocolVersion": "2024-11-05",
+        "capabilities": {},
+        "clientInfo": {"name": "test", "version": "1.0"}
+    }))
+    assert response["result"]["serverInfo"]["name"] == "codebase-patterns-mcp"
+
+
+def test_tools_list(server):
+    tools = server.handle_request(make_request("tools/list"))["result"]["tools"]
+    assert {"search_code", "get_stats"} <= {tool["name"] for tool in tools}
+
+
+def test_search_code(server):
+    result = tool_result(server.handle_request(search_request(1, "JWT authentication", limit=3)))
+    assert result["results_count"] == 3
+    assert all(r["code_preview"] for r in result["results"])
+
+
+def test_search_code_type_filter(server):
+    result = tool_result(server.handle_request(
+        search_request(1, "HTTP request middleware", limit=5, code_type="middleware")
+    ))
+    expected = sum(1 for *_, code_type, _code in SAMPLE_FUNCTIONS if code_type == "middleware")
+    assert result["results_count"] == expected
+    assert {r["code_type"] for r in result["results"]} == {"middleware"}
+
+
+def test_repeated_type_filter_matches_chroma(server, store, embedder, monkeypatch):
+    """From its second request a code_type is answered by the partition scan"""
+    query, filter_metadata = "load invoice from the database", {"code_type": "handler"}
+    expected = store.collection.query(query_embeddings=embedder.generate_embeddings([query]),
+                                      n_results=2, where=filter_metadata)
+
+    scans = []
+    scan_partition = store._scan_partition
+    monkeypatch.setattr(store, "_scan_partition",
+                        lambda *args: scans.append(args) or scan_partition(*args))
+
+    for i in range(3):
+        result = tool_result(server.handle_request(
+            search_request(i, query, limit=2, code_type="handler")
+        ))
+        assert [(r["repo"], r["file"], r["function"]) for r in result["results"]] == \
+            [(m["repo"], m["file"], m["function"]) for m in expected["metadatas"][0]]
+
+    assert len(scans) >= 2  # Every request after the first
+
+
+def test_get_stats(server):
+    stats = tool_result(server.handle_request(
+        make_request("tools/call", {"name": "get_stats", "arguments": {}})
+    ))
+    assert stats["total_functions"] == len(SAMPLE_FUNCTIONS)
+    assert set(stats["repos"]) == {repo for repo, *_ in SAMPLE_FUNCTIONS}
+
+
+def test_resources(server):
+    resources = server.handle_request(make_request("resources/list"))["result"]["resources"]
+    assert "codebase://stats" in {r["uri"] for r in resources}
+
+    response = server.handle_request(make_request("resources/read", {"uri": "codebase://stats"}))
+    stats = json.loads(response["result"]["contents"][0]["text"])
+    assert stats["total_functions"] == len(SAMPLE_FUNCTIONS)
+
+
+def test_unknown_method(server):
+    response = server.handle_request(make_request("invalid_method"))
+    assert response["error"]["code"] == -32601
+
+
+def test_concurrent_searches(server):
+    """Searches on the server's worker threads share the store and embedding cache"""
+    queries = [f"query {i}" for i in range(32)]
+
+    with ThreadPoolExecutor(max_workers=server.MAX_CONCURRENT_REQUESTS) as executor:
+        responses = list(executor.map(
+            lambda i: server.handle_request(search_request(i, queries[i], limit=3)),
+            range(len(queries))
+        ))
+
+    for i, response in enumerate(responses):
+        assert "error" not in response, response["error"]
+        assert response["id"] == i
+        result = json.loads(response["result"]["content"][0]["text"])
+        assert result["query"] == queries[i]
+        assert result["results_count"] == 3
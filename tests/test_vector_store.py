@@ -0,0 +1,88 @@
+"""VectorStore scan caches (session store, fake embeddings)"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .conftest import SAMPLE_FUNCTIONS, fake_embedding
+
+HANDLER = {"code_type": "handler"}
+
+
+@pytest.fixture
+def cold_partitions(store):
+    """The session store with no partition built or requested yet"""
+    store._partitions, store._partition_requests = {}, type(store._partition_requests)()
+    yield store
+    store._partitions, store._partition_requests = {}, type(store._partition_requests)()
+
+
+def test_partition_built_once_under_concurrency(cold_partitions, monkeypatch):
+    store = cold_partitions
+    builds = []
+    build_partition = store._build_partition
+
+    def counting_build(*args):
+        builds.append(threading.get_ident())
+        return build_partition(*args)
+
+    monkeypatch.setattr(store, "_build_partition", counting_build)
+    store._partition(HANDLER)  # First request only counts
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        partitions = list(executor.map(lambda _: store._partition(HANDLER), range(32)))
+
+    assert len(builds) == 1
+    expected = sum(1 for *_, code_type, _code in SAMPLE_FUNCTIONS if code_type == "handler")
+    assert all(p is not None and len(p[0]) == expected for p in partitions)
+
+
+def test_partition_short_read_not_cached(cold_partitions, monkeypatch):
+    store = cold_partitions
+    get = store.collection.get
+
+    def short_get(*args, **kwargs):
+        result = get(*args, **kwargs)
+        if kwargs.get("ids") is not None:  # Embedding fetch - drop a row
+            result = {**result, "ids": result["ids"][1:], "embeddings": result["embeddings"][1:]}
+        return result
+
+    monkeypatch.setattr(store.collection, "get", short_get)
+    store._partition(HANDLER)
+
+    assert store._partition(HANDLER) is None
+    assert "handler" not in store._partitions
+
+
+def test_top_k_by_score_exact(store):
+    _repo, file, name, _type, code = SAMPLE_FUNCTIONS[3]
+    best_id, similarity = store.top_k_by_score(fake_embedding(code), k=1)[0]
+
+    assert best_id.endswith(f"{file}:{name}")
+    assert similarity == pytest.approx(1.0, abs=1e-6)
+    assert store.score_batch(fake_embedding(code)).shape == (len(SAMPLE_FUNCTIONS),)
+
+
+def test_reset_vacuums_and_keeps_store_usable(tmp_path, embedder):
+    from src.indexer import IndexedFunction
+    from src.vector_store import VectorStore
+
+    store = VectorStore(persist_directory=str(tmp_path), collection_name="reset_test",
+                        embedding_generator=embedder)
+    functions = [
+        IndexedFunction(id=f"r/f.go:F{i}", content=f"func F{i}() {{ /* {'x' * 2000} */ }}",
+                        metadata={"repo": "r", "file": "f.go", "function": f"F{i}", "code_type": "other"})
+        for i in range(200)
+    ]
+    store.add_functions(functions, [fake_embedding(f.content) for f in functions])
+    db_path = tmp_path / "chroma.sqlite3"
+    size_before = db_path.stat().st_size
+
+    store.reset(vacuum=True)
+    assert store.collection.count() == 0
+    assert store.get_stats() == {"total_functions": 0, "repos": {}, "types": {}}
+    assert db_path.stat().st_size < size_before
+
+    store.add_functions(functions[:1], [fake_embedding(functions[0].content)])
+    assert store.get_stats()["types"] == {"other": 1}